@@ -0,0 +1,556 @@
+"""
+Back label sheets: ingredients, ABV, lot and QR code, 16 per A4 page (ReportLab).
+"""
+
+import hashlib
+import os
+import sys
+from collections import OrderedDict
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from reportlab.lib.units import mm
+from reportlab.lib.colors import HexColor
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+import qrcode
+
+from render_profile import NULL_PROFILE
+from recipes import clean_ingredient_name, format_ingredients, shared_recipe_index, should_include_ingredient
+
+
+class QRCodeCache:
+    """
+    LRU cache of encoded QR code images, optionally persisted to disk.
+
+    Entries are keyed by (url, color, error correction level). Each entry keeps
+    the PNG bytes plus a single ImageReader, so an image is encoded and decoded
+    once per run and ReportLab embeds it as one shared image XObject.
+    """
+
+    def __init__(self, maxsize=64, cache_dir=None):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of QR images held in memory
+            cache_dir: Directory to persist PNGs across runs (None = memory only)
+        """
+        self.maxsize = maxsize
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        digest = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{digest}.png"
+
+    def get(self, key, render):
+        """
+        Return the cached PNG bytes for key, rendering on a miss.
+
+        Args:
+            key: Tuple of (url, color, error correction level)
+            render: Callable returning PNG bytes when the image is not cached
+
+        Returns:
+            PNG bytes
+        """
+        return self._entry(key, render)['png']
+
+    def image_reader(self, key, render):
+        """Return a shared ReportLab ImageReader for key, rendering on a miss."""
+        entry = self._entry(key, render)
+        if entry['reader'] is None:
+            entry['reader'] = ImageReader(BytesIO(entry['png']))
+        return entry['reader']
+
+    def _entry(self, key, render):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        png = None
+        if self.cache_dir:
+            path = self._disk_path(key)
+            if path.exists():
+                png = path.read_bytes()
+        if png is None:
+            png = render()
+            if self.cache_dir:
+                # Write-then-rename so concurrent workers never read a partial file
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                path = self._disk_path(key)
+                tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+                tmp_path.write_bytes(png)
+                tmp_path.replace(path)
+
+        entry = {'png': png, 'reader': None}
+        self._entries[key] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return entry
+
+
+# Shared by every generator in the process unless one is passed explicitly
+QR_CACHE = QRCodeCache()
+
+
+@lru_cache(maxsize=64)
+def qr_matrix(url, error_correction):
+    """
+    Encode a URL as a QR module matrix, including a 1-module quiet zone.
+
+    Args:
+        url: Data to encode
+        error_correction: qrcode error correction constant
+
+    Returns:
+        Tuple of rows, each a tuple of booleans (True = dark module)
+    """
+    qr = qrcode.QRCode(version=1, error_correction=error_correction, border=1)
+    qr.add_data(url)
+    qr.make(fit=True)
+    return tuple(tuple(row) for row in qr.get_matrix())
+
+
+@lru_cache(maxsize=256)
+def wrap_text(text, font_name, font_size, first_width, width):
+    """
+    Greedy word wrap, cached per (text, font, size, widths).
+
+    Each word is measured once and line widths are accumulated, rather than
+    re-measuring the whole line for every word added.
+
+    Args:
+        text: Text to wrap
+        font_name: ReportLab font name
+        font_size: Font size in points
+        first_width: Maximum width of the first line
+        width: Maximum width of subsequent lines
+
+    Returns:
+        Tuple of lines
+    """
+    space_width = stringWidth(' ', font_name, font_size)
+    lines = []
+    current_line = []
+    current_width = 0.0
+
+    for word in text.split():
+        word_width = stringWidth(word, font_name, font_size)
+        max_width = first_width if not lines else width
+        test_width = current_width + space_width + word_width if current_line else word_width
+        if test_width <= max_width:
+            current_line.append(word)
+            current_width = test_width
+        else:
+            if current_line:
+                lines.append(' '.join(current_line))
+            current_line = [word]
+            current_width = word_width
+
+    if current_line:
+        lines.append(' '.join(current_line))
+    return tuple(lines)
+
+
+class BreweryLabelGenerator:
+    """Generate bottle labels for Dalston Rooftop Brewery."""
+
+    # Brand colors
+    NAVY_BLUE = HexColor('#1a2838')
+    WARM_BEIGE = HexColor('#d4c5a9')
+    SUNSET_ORANGE = HexColor('#ff8c42')
+    DARK_GRAY = HexColor('#2a2a2a')
+
+    # QR code color palette (warm colors from brewery branding)
+    QR_COLORS = [
+        '#ff8c42',  # Sunset orange
+        '#ffb366',  # Lighter orange
+        '#ffa94d',  # Medium orange
+        '#d4a574',  # Light brown
+        '#c9a772',  # Tan
+        '#d4c5a9',  # Warm beige
+        '#e6c79c',  # Pale tan
+        '#ffcc80',  # Light orange/peach
+    ]
+
+    # QR code color mode: 'single' or 'cycle'
+    QR_COLOR_MODE = 'single'  # Set to 'cycle' to rotate through palette
+    QR_SINGLE_COLOR_INDEX = 7  # Index in QR_COLORS (7 = #ffcc80, light orange/peach)
+    QR_ERROR_CORRECTION = qrcode.constants.ERROR_CORRECT_L
+
+    # QR code render mode: 'vector' draws modules as PDF paths, 'raster' embeds a PNG
+    QR_RENDER_MODE = 'vector'
+
+    # Label dimensions (in points, 1mm = 2.834645669 points)
+    LABEL_WIDTH = 40 * mm
+    LABEL_HEIGHT = 60 * mm
+    MARGIN = 2 * mm  # Reduced from 5mm
+    GAP = 10 * mm
+    HEADER_HEIGHT = 8 * mm  # Reduced from 10mm
+
+    # Text and QR placement within a label
+    TEXT_INSET = 5 * mm
+    TEXT_TOP = 8 * mm  # First baseline below the top edge
+    LINE_SPACING = 2.5 * mm
+    QR_SIZE = 32 * mm  # Increased from 25mm
+    QR_BOTTOM = 5 * mm
+
+    # Grid layout per A4 page (4 columns x 4 rows)
+    LABELS_PER_ROW = 4
+    LABELS_PER_COL = 4
+    LABELS_PER_PAGE = LABELS_PER_ROW * LABELS_PER_COL
+
+    def __init__(self, batch_name, style, recipe_path, abv, url, lot_number=None,
+                 qr_cache=None, qr_mode=None, recipe_index=None, profile=None):
+        """
+        Initialize the label generator.
+
+        Args:
+            batch_name: Display name of the batch (e.g., "Navarino Road")
+            style: Style of the brew (e.g., "Hibiscus Mead")
+            recipe_path: Path to recipe JSON file
+            abv: ABV percentage as string (e.g., "11.81")
+            url: URL to the product page
+            lot_number: Lot number (e.g., "LOT 098" or "LOT 098-A")
+            qr_cache: QRCodeCache to reuse QR images (default: shared QR_CACHE)
+            qr_mode: 'vector' or 'raster' (default: QR_RENDER_MODE)
+            recipe_index: RecipeIndex to read ingredients from (default: shared index)
+            profile: RenderProfile to record stage timings in (default: off)
+        """
+        self.batch_name = batch_name
+        self.style = style
+        self.recipe_path = Path(recipe_path)
+        self.abv = abv
+        self.url = url
+        self.lot_number = lot_number
+        self.qr_cache = qr_cache if qr_cache is not None else QR_CACHE
+        self.qr_mode = qr_mode or self.QR_RENDER_MODE
+        self.recipe_index = recipe_index if recipe_index is not None else shared_recipe_index()
+        self.profile = profile or NULL_PROFILE
+        self._embedded = set()
+        with self.profile.stage('back.ingredients'):
+            self.ingredients = self.extract_ingredients()
+
+    def extract_ingredients(self):
+        """
+        Look up the recipe's ingredients in the recipe index, applying marketing filters.
+
+        The recipe JSON is only parsed when it is new or has changed since it
+        was last indexed.
+
+        Returns:
+            Formatted ingredient string (e.g., "Honey, hibiscus, ginger, cinnamon.")
+        """
+        entry = self.recipe_index.lookup(self.recipe_path)
+        return format_ingredients(entry['ingredients'])
+
+    def _should_include_ingredient(self, name):
+        """Check if ingredient should be included per marketing rules."""
+        return should_include_ingredient(name)
+
+    def _clean_ingredient_name(self, name):
+        """Clean up ingredient name by removing obvious processing details."""
+        return clean_ingredient_name(name)
+
+    def generate_qr_code(self, color="#ff8c42"):
+        """
+        Generate QR code image for URL.
+
+        Args:
+            color: Hex color for QR code (default: sunset orange)
+
+        Returns:
+            BytesIO buffer containing PNG image
+        """
+        png = self.qr_cache.get(self._qr_key(color), lambda: self._render_qr_png(color))
+        return BytesIO(png)
+
+    def _qr_key(self, color):
+        return (self.url, color, self.QR_ERROR_CORRECTION)
+
+    def _render_qr_png(self, color):
+        """Encode the URL as a QR code and return it as PNG bytes."""
+        with self.profile.stage('back.qr_encode'):
+            self.profile.count('qr_encodings')
+            return self._encode_qr_png(color)
+
+    def _encode_qr_png(self, color):
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=self.QR_ERROR_CORRECTION,
+            box_size=10,
+            border=1,
+        )
+        qr.add_data(self.url)
+        qr.make(fit=True)
+
+        img = qr.make_image(fill_color=color, back_color="white")
+        buffer = BytesIO()
+        img.save(buffer, format='PNG')
+        return buffer.getvalue()
+
+    def draw_qr_vector(self, c, x, y, size, color):
+        """
+        Draw the QR code as vector modules at position (x, y).
+
+        The modules are drawn once into a ReportLab form per (url, color) and
+        every label on the canvas references that form.
+
+        Args:
+            c: ReportLab canvas
+            x: X position (bottom-left corner)
+            y: Y position (bottom-left corner)
+            size: Width and height of the QR code in points
+            color: Hex color for the dark modules
+        """
+        form_name = 'qr' + hashlib.sha1(repr(self._qr_key(color)).encode('utf-8')).hexdigest()[:16]
+        with self.profile.stage('back.qr_encode'):
+            misses = qr_matrix.cache_info().misses
+            matrix = qr_matrix(self.url, self.QR_ERROR_CORRECTION)
+            self.profile.count('qr_encodings', qr_matrix.cache_info().misses - misses)
+        n = len(matrix)
+
+        if not c.hasForm(form_name):
+            self.profile.count('qr_forms')
+            c.beginForm(form_name, lowerx=0, lowery=0, upperx=n, uppery=n)
+            c.setFillColor(HexColor('#ffffff'))
+            c.rect(0, 0, n, n, stroke=0, fill=1)
+
+            # One rectangle per horizontal run of dark modules, in a single path
+            path = c.beginPath()
+            for row_index, row in enumerate(matrix):
+                row_y = n - 1 - row_index
+                run_start = None
+                for col, dark in enumerate(row + (False,)):
+                    if dark and run_start is None:
+                        run_start = col
+                    elif not dark and run_start is not None:
+                        path.rect(run_start, row_y, col - run_start, 1)
+                        run_start = None
+            c.setFillColor(HexColor(color))
+            c.drawPath(path, stroke=0, fill=1)
+            c.endForm()
+
+        c.saveState()
+        c.translate(x, y)
+        c.scale(size / n, size / n)
+        c.doForm(form_name)
+        c.restoreState()
+
+    def draw_page_header(self, c, page_number=1, page_count=1):
+        """
+        Draw page header at top of A4 page for tracking.
+
+        Args:
+            c: ReportLab canvas
+            page_number: 1-based number of this page
+            page_count: Total number of pages (page numbers shown if > 1)
+        """
+        width, height = A4
+
+        # Header text
+        c.setFillColor(self.NAVY_BLUE)
+        c.setFont("Helvetica-Bold", 12)
+        header_text = f"{self.batch_name} ({self.style})"
+        if page_count > 1:
+            header_text += f" — {page_number}/{page_count}"
+        text_width = c.stringWidth(header_text, "Helvetica-Bold", 12)
+        x = (width - text_width) / 2
+        y = height - self.MARGIN - 5 * mm
+        c.drawString(x, y, header_text)
+
+    def layout_ingredients(self):
+        """
+        Wrap the ingredient list to the label width.
+
+        The first line starts after the "Ingredients: " heading. The layout is
+        cached, so every label on a sheet reuses the same lines.
+
+        Returns:
+            Tuple of lines
+        """
+        with self.profile.stage('back.wrap'):
+            text_width = self.LABEL_WIDTH - 2 * self.TEXT_INSET
+            label_width = stringWidth("Ingredients: ", "Helvetica-Bold", 8)
+            return wrap_text(self.ingredients, "Helvetica", 7, text_width - label_width, text_width)
+
+    def ingredients_overflow(self):
+        """
+        Check whether the label text runs into the QR code.
+
+        Returns:
+            True if the last text baseline is too low to clear the QR code
+        """
+        line_count = max(1, len(self.layout_ingredients()))
+        text_bottom = (self.LABEL_HEIGHT - self.TEXT_TOP
+                       - (line_count - 1) * self.LINE_SPACING
+                       - 4 * mm  # ABV line
+                       - (3 * mm if self.lot_number else 0))
+        # Descenders may dip into the QR code's white quiet zone, but no further
+        return text_bottom < self.QR_BOTTOM + self.QR_SIZE
+
+    def draw_label(self, c, x, y, label_index=0):
+        """
+        Draw a single label at position (x, y).
+
+        Args:
+            c: ReportLab canvas
+            x: X position (bottom-left corner)
+            y: Y position (bottom-left corner)
+            label_index: Index of this label (for color rotation)
+        """
+        # Draw border (light cutting guide)
+        c.setStrokeColor(self.WARM_BEIGE)
+        c.setLineWidth(0.5)
+        c.rect(x, y, self.LABEL_WIDTH, self.LABEL_HEIGHT)
+
+        # Ingredients section
+        y_pos = y + self.LABEL_HEIGHT - self.TEXT_TOP
+
+        # Combine "Ingredients: " with the ingredient list on same line
+        c.setFillColor(self.NAVY_BLUE)
+        c.setFont("Helvetica-Bold", 8)
+        label_text = "Ingredients: "
+        label_width = stringWidth(label_text, "Helvetica-Bold", 8)
+        c.drawString(x + self.TEXT_INSET, y_pos, label_text)
+
+        # Draw ingredients continuing on same line
+        c.setFillColor(self.DARK_GRAY)
+        c.setFont("Helvetica", 7)
+
+        x_offset = x + self.TEXT_INSET + label_width
+        for i, line in enumerate(self.layout_ingredients()):
+            if i == 0:
+                # First line continues after "Ingredients: "
+                c.drawString(x_offset, y_pos, line)
+            else:
+                # Subsequent lines start at left margin - reduced spacing
+                y_pos -= self.LINE_SPACING
+                c.drawString(x + self.TEXT_INSET, y_pos, line)
+
+        # ABV - more space before, bold label to match Ingredients
+        y_pos -= 4 * mm
+        c.setFillColor(self.NAVY_BLUE)
+        c.setFont("Helvetica-Bold", 8)
+        abv_label = "ABV: "
+        abv_label_width = c.stringWidth(abv_label, "Helvetica-Bold", 8)
+        c.drawString(x + self.TEXT_INSET, y_pos, abv_label)
+
+        c.setFillColor(self.DARK_GRAY)
+        c.setFont("Helvetica", 7)
+        c.drawString(x + self.TEXT_INSET + abv_label_width, y_pos, f"{self.abv}%")
+
+        # Lot Number - if provided
+        if self.lot_number:
+            y_pos -= 3 * mm
+            c.setFillColor(self.NAVY_BLUE)
+            c.setFont("Helvetica-Bold", 8)
+            lot_label = "Lot: "
+            lot_label_width = c.stringWidth(lot_label, "Helvetica-Bold", 8)
+            c.drawString(x + self.TEXT_INSET, y_pos, lot_label)
+
+            c.setFillColor(self.DARK_GRAY)
+            c.setFont("Helvetica", 7)
+            c.drawString(x + self.TEXT_INSET + lot_label_width, y_pos, self.lot_number)
+
+        # QR Code - use color from palette
+        if self.QR_COLOR_MODE == 'cycle':
+            qr_color = self.QR_COLORS[label_index % len(self.QR_COLORS)]
+        else:
+            qr_color = self.QR_COLORS[self.QR_SINGLE_COLOR_INDEX]
+        qr_size = self.QR_SIZE
+        qr_x = x + (self.LABEL_WIDTH - qr_size) / 2
+        qr_y = y + self.QR_BOTTOM
+        if self.qr_mode == 'vector':
+            self.draw_qr_vector(c, qr_x, qr_y, qr_size, qr_color)
+        else:
+            key = self._qr_key(qr_color)
+            qr_img = self.qr_cache.image_reader(key, lambda: self._render_qr_png(qr_color))
+            c.drawImage(qr_img, qr_x, qr_y, width=qr_size, height=qr_size)
+            # ReportLab embeds each distinct image once per document and references it after
+            if key not in self._embedded:
+                self._embedded.add(key)
+                self.profile.count('image_embeds')
+            self.profile.count('image_draws')
+
+    def label_positions(self):
+        """
+        Yield the (x, y) bottom-left corner of each label slot on a page.
+
+        Slots are ordered left to right, top to bottom.
+        """
+        width, height = A4
+
+        # Adjust top margin to account for header
+        top_margin = self.MARGIN + self.HEADER_HEIGHT
+
+        for row in range(self.LABELS_PER_COL):
+            for col in range(self.LABELS_PER_ROW):
+                x = self.MARGIN + col * (self.LABEL_WIDTH + self.GAP)
+                y = height - top_margin - (row + 1) * self.LABEL_HEIGHT - row * self.GAP
+                yield x, y
+
+    def generate_pdf(self, output, num_labels=16):
+        """
+        Generate PDF with any number of labels, paginated over A4 pages.
+
+        Each page is finished with showPage() as soon as its labels are drawn,
+        and QR codes are shared forms, so per-page time stays constant.
+        Memory is not quite flat: ReportLab keeps every finished page until
+        save(), about 1 KB per label (some 18 MiB for 16,000 labels).
+
+        Args:
+            output: Path to save PDF, or a writable binary stream (e.g. a
+                BytesIO, HTTP response or spool file)
+            num_labels: Number of labels to generate (16 per page)
+        """
+        to_stream = hasattr(output, 'write')
+        # On stderr, so a PDF streamed to stdout is never mixed with text
+        if self.ingredients_overflow():
+            print(f"Warning: Ingredients for {self.batch_name} overflow into the QR code "
+                  f"({len(self.layout_ingredients())} lines)", file=sys.stderr)
+
+        c = canvas.Canvas(output if to_stream else str(output), pagesize=A4)
+        page_count = max(1, -(-num_labels // self.LABELS_PER_PAGE))
+        self._embedded = set()
+        seekable = to_stream and getattr(output, 'seekable', lambda: False)()
+        start = output.tell() if seekable else None
+
+        label_count = 0
+        for page_number in range(1, page_count + 1):
+            with self.profile.stage('back.draw'):
+                self.draw_page_header(c, page_number, page_count)
+
+                for x, y in self.label_positions():
+                    if label_count >= num_labels:
+                        break
+                    self.draw_label(c, x, y, label_index=label_count)
+                    label_count += 1
+
+                c.showPage()
+
+        with self.profile.stage('back.save'):
+            c.save()
+        if to_stream:
+            size = output.tell() - start if start is not None else None
+        else:
+            size = Path(output).stat().st_size
+        self.profile.record_output('back', self.batch_name, size, page_count)
+        if not to_stream:
+            print(f"Generated {label_count} labels on {page_count} page(s): {output}")
+
+    def render_bytes(self, num_labels=16):
+        """Render the back sheet and return the PDF as bytes, without touching disk."""
+        buffer = BytesIO()
+        self.generate_pdf(buffer, num_labels=num_labels)
+        return buffer.getvalue()
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Build the batch pages in docs/ (the targets of the back-label QR codes).
+
+Each labelable batch in brew-log.md gets docs/<slug>/index.html, built from
+its log entries (stats as logged), its recipe's index entry (ingredients,
+and stored stats where the log has none) and any curated copy for it in
+assets/batch-pages.json, and docs/index.html lists them all. A page's path
+is derived from the same batch URL the QR code encodes, so a label can't
+point anywhere the generator didn't write.
+
+Every generated page carries a <meta name="generator"> tag holding the
+SHA-256 of its own content. A page is only rewritten when that tag is
+present and still matches, i.e. the builder wrote it and nobody has edited
+it since; anything else is left alone unless force is given. The record
+travels with the file, so it holds in any checkout. Pages are only written
+when their content differs.
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+
+from brew_log import SITE_URL, BrewLog
+from recipes import BASE_DIR, batch_abv, shared_recipe_index
+
+
+SITE_DIR = BASE_DIR / 'docs'
+CURATED_PATH = BASE_DIR / 'assets' / 'batch-pages.json'
+
+# Page data fields that curated copy can replace
+CURATED_FIELDS = ('style', 'pitch', 'ingredients', 'note', 'tables')
+
+# Ownership marker; the digest is of the page with the placeholder in place
+GENERATOR_META = '<meta name="generator" content="batch_pages sha256:{digest}">'
+GENERATOR_PLACEHOLDER = GENERATOR_META.format(digest='')
+GENERATOR_TAG = re.compile(r'<meta name="generator" content="batch_pages sha256:([0-9a-f]{64})">')
+
+SITE_TITLE = 'Dalston Rooftop Brewery'
+
+PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    {generator}
+    <title>{name} - {site_title}</title>
+    <link rel="stylesheet" href="../style.css">
+</head>
+<body>
+    <header>
+        <h1>{name}</h1>
+        <div class="brew-meta-header">{meta}</div>
+    </header>
+
+    <div class="container">
+        <a href="../index.html" class="back-link">← Back to all brews</a>
+
+        <div class="brew-details">
+{sections}
+        </div>
+    </div>
+
+    <footer>
+        <p>&copy; {year} {site_title}</p>
+    </footer>
+</body>
+</html>
+'''
+
+INDEX_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    {generator}
+    <title>{site_title}</title>
+    <link rel="stylesheet" href="style.css">
+</head>
+<body>
+    <header>
+        <h1>{site_title}</h1>
+        <p>Craft beers and meads from East London</p>
+    </header>
+
+    <div class="container">
+        <div class="intro">
+            <h2>Our Brews</h2>
+            <p>Small-batch craft beers and meads brewed on a Dalston rooftop. Each batch is named after a local street, celebrating the neighborhood's character.</p>
+        </div>
+
+        <div class="brews-grid">
+{cards}
+        </div>
+    </div>
+
+    <footer>
+        <p>&copy; {year} {site_title}</p>
+    </footer>
+</body>
+</html>
+'''
+
+
+def page_path(url, site_dir=SITE_DIR):
+    """
+    Return the file a batch URL is served from.
+
+    Args:
+        url: Batch URL, as encoded in the back-label QR code
+        site_dir: Local root of the site
+
+    Raises:
+        ValueError: If the URL is not on the site
+    """
+    if not url.startswith(SITE_URL):
+        raise ValueError(f"URL is not on {SITE_URL}: {url}")
+    return Path(site_dir) / url[len(SITE_URL):] / 'index.html'
+
+
+def load_curated(path=CURATED_PATH):
+    """Return the curated page copy, keyed by batch slug ({} if there is none)."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def page_data(slug, brew_log, index=None, curated=None):
+    """
+    Collect everything a batch page shows.
+
+    Args:
+        slug: Batch slug
+        brew_log: BrewLog
+        index: RecipeIndex (default: the shared index)
+        curated: Curated copy for the batch (style, pitch, ingredients, note
+            and tables keyed by title), replacing what the log and recipe give
+
+    Returns:
+        JSON-serialisable dict
+    """
+    index = index or shared_recipe_index()
+    config = brew_log.batch_config(slug)
+    lots = brew_log.lots(slug)
+    latest = lots[0]
+    logged = next(e for e in lots if e['lot'] == config['lot'])
+
+    try:
+        recipe = index.lookup(BASE_DIR / config['recipe'])
+    except (OSError, ValueError):
+        # The community recipe has not been fetched into .cache/recipes/
+        recipe = None
+
+    data = {
+        'slug': slug,
+        'url': config['url'],
+        'name': config['name'],
+        'style': config['style'],
+        'lot': config['lot'],
+        'status': latest['status'],
+        'brewed': latest['brewed'],
+        'pitch': latest['pitch'],
+        'abv': batch_abv(config, index) if recipe or config['abv'] else '?',
+        'ibu': _logged_stat(logged, recipe, 'ibu'),
+        'og': _logged_stat(logged, recipe, 'og'),
+        'fg': _logged_stat(logged, recipe, 'fg'),
+        'ingredients': recipe['ingredients'] if recipe else [],
+        'lots': [{'lot': e['lot'], 'brewed': e['brewed'], 'status': e['status']}
+                 for e in lots],
+        'variants': latest['variants'],
+        'note': None,
+        'tables': {},
+    }
+    data.update((k, v) for k, v in (curated or {}).items() if k in CURATED_FIELDS)
+    return data
+
+
+def _logged_stat(entry, recipe, name):
+    # The log's Stats section wins over the recipe's stored value
+    if entry[name] is not None:
+        return float(entry[name])
+    return recipe and recipe.get(name)
+
+
+def stamp(page):
+    """Fill in a rendered page's generator tag with the digest of the page."""
+    digest = hashlib.sha256(page.encode('utf-8')).hexdigest()
+    return page.replace(GENERATOR_PLACEHOLDER, GENERATOR_META.format(digest=digest), 1)
+
+
+def is_generated(page):
+    """Return True if page was written by the builder and not edited since."""
+    m = GENERATOR_TAG.search(page)
+    if not m:
+        return False
+    unstamped = page[:m.start()] + GENERATOR_PLACEHOLDER + page[m.end():]
+    return hashlib.sha256(unstamped.encode('utf-8')).hexdigest() == m.group(1)
+
+
+def _escape(text):
+    return html.escape(text, quote=False)
+
+
+def _month(date, short=False):
+    try:
+        parsed = datetime.strptime((date or '')[:10], '%Y-%m-%d')
+    except ValueError:
+        return date or 'Unknown'
+    return parsed.strftime('%b %Y' if short else '%B %Y')
+
+
+def _status(status):
+    """Return (css class, badge text) for a log status, or (None, status)."""
+    text = (status or '').lower()
+    if 'consumed' in text or text.startswith('gone'):
+        return 'status-consumed', 'Gone!'
+    if text.startswith('bottled'):
+        return 'status-bottled', 'Bottled'
+    if text.startswith('ferment'):
+        return 'status-fermenting', 'Fermenting'
+    return None, status
+
+
+def _kind(style):
+    return 'mead' if 'mead' in (style or '').lower() else 'beer'
+
+
+def _stats(data):
+    stats = [('ABV', f"{data['abv']}%")]
+    if data['ibu']:
+        stats.append(('IBU', f"{data['ibu']:.0f}"))
+    if data['og']:
+        stats.append(('OG', f"{data['og']:.3f}"))
+    if data['fg']:
+        stats.append(('FG', f"{data['fg']:.3f}"))
+    return stats
+
+
+def _stat_divs(stats, indent):
+    pad = ' ' * indent
+    return '\n'.join(
+        f'{pad}<div class="stat">\n'
+        f'{pad}    <div class="stat-label">{_escape(label)}</div>\n'
+        f'{pad}    <div class="stat-value">{_escape(value)}</div>\n'
+        f'{pad}</div>'
+        for label, value in stats
+    )
+
+
+def _table(title, headings, rows):
+    pad = ' ' * 12
+    head = ''.join(f'\n{pad}                <th>{_escape(h)}</th>' for h in headings)
+    body = ''.join(
+        f'\n{pad}            <tr>'
+        + ''.join(f'\n{pad}                <td>{_escape(cell or "")}</td>' for cell in row)
+        + f'\n{pad}            </tr>'
+        for row in rows
+    )
+    return (
+        f'{pad}<div class="section">\n'
+        f'{pad}    <h2>{_escape(title)}</h2>\n'
+        f'{pad}    <table class="variants-table">\n'
+        f'{pad}        <thead>\n'
+        f'{pad}            <tr>{head}\n'
+        f'{pad}            </tr>\n'
+        f'{pad}        </thead>\n'
+        f'{pad}        <tbody>{body}\n'
+        f'{pad}        </tbody>\n'
+        f'{pad}    </table>\n'
+        f'{pad}</div>'
+    )
+
+
+def render_page(data, year=None):
+    """
+    Render a batch page.
+
+    Args:
+        data: Page data (see page_data)
+        year: Copyright year (default: the current year)
+
+    Returns:
+        HTML string
+    """
+    pad = ' ' * 12
+    sections = []
+    if data['pitch']:
+        sections.append(
+            f'{pad}<div class="section">\n'
+            f'{pad}    <h2>About This Brew</h2>\n'
+            f'{pad}    <p>{_escape(data["pitch"])}</p>\n'
+            f'{pad}</div>'
+        )
+    if data['note']:
+        sections.append(
+            f'{pad}<div class="consumed-note">\n'
+            f'{pad}    <strong>Status:</strong> {_escape(data["note"])}\n'
+            f'{pad}</div>'
+        )
+
+    stats = _stats(data)
+    stats.append(('Status', _status(data['status'])[1] or 'Unknown'))
+    sections.append(f'{pad}<div class="stats-grid">\n{_stat_divs(stats, 16)}\n{pad}</div>')
+
+    sections.append(f'{pad}<div class="photo-placeholder">\n{pad}    Photo coming soon\n{pad}</div>')
+
+    if data['ingredients']:
+        items = '\n'.join(f'{pad}        <li>{_escape(name[:1].upper() + name[1:])}</li>'
+                          for name in data['ingredients'])
+        sections.append(
+            f'{pad}<div class="section">\n'
+            f'{pad}    <h2>Ingredients</h2>\n'
+            f'{pad}    <ul class="ingredients-list">\n{items}\n'
+            f'{pad}    </ul>\n'
+            f'{pad}</div>'
+        )
+
+    # Curated tables replace the generated table of the same title
+    tables = dict(data['tables'])
+    if len(data['lots']) > 1:
+        tables.setdefault('Lots', {
+            'headings': ['Lot', 'Brewed', 'Status'],
+            'rows': [(lot['lot'], _month(lot['brewed']), lot['status']) for lot in data['lots']],
+        })
+    if len(data['variants']) > 1:
+        tables.setdefault('Bottling Variants', {
+            'headings': ['Lot', 'Variant'],
+            'rows': [(v['lot'], v['name']) for v in data['variants']],
+        })
+    order = ['Lots', 'Bottling Variants']
+    for title in sorted(tables, key=lambda t: order.index(t) if t in order else len(order)):
+        sections.append(_table(title, tables[title]['headings'], tables[title]['rows']))
+
+    return stamp(PAGE_TEMPLATE.format(
+        name=_escape(data['name']),
+        meta=_escape(f"{data['style']} • Brewed {_month(data['brewed'])}"),
+        sections='\n\n'.join(sections),
+        year=year or datetime.now().year,
+        site_title=SITE_TITLE,
+        generator=GENERATOR_PLACEHOLDER,
+    ))
+
+
+def render_index(pages, year=None):
+    """
+    Render docs/index.html.
+
+    Args:
+        pages: Page data of every batch, in display order
+        year: Copyright year (default: the current year)
+
+    Returns:
+        HTML string
+    """
+    pad = ' ' * 12
+    cards = []
+    for data in pages:
+        status_class, badge = _status(data['status'])
+        meta = f'{pad}        <span class="brew-style">{_escape(data["style"])}</span>'
+        if status_class:
+            meta += f'\n{pad}        <span class="brew-status {status_class}">{_escape(badge)}</span>'
+        pitch = (f'\n{pad}    <p class="brew-pitch">{_escape(data["pitch"])}</p>'
+                 if data['pitch'] else '')
+        stats = [_stats(data)[0], ('Brewed', _month(data['brewed'], short=True))]
+        href = page_path(data['url'], site_dir='').as_posix()
+        cards.append(
+            f'{pad}<a href="{html.escape(href)}" class="brew-card {_kind(data["style"])}">\n'
+            f'{pad}    <h2>{_escape(data["name"])}</h2>\n'
+            f'{pad}    <div class="brew-meta">\n{meta}\n'
+            f'{pad}    </div>{pitch}\n'
+            f'{pad}    <div class="brew-stats">\n{_stat_divs(stats, 20)}\n'
+            f'{pad}    </div>\n'
+            f'{pad}</a>'
+        )
+
+    return stamp(INDEX_TEMPLATE.format(
+        cards='\n\n'.join(cards),
+        year=year or datetime.now().year,
+        site_title=SITE_TITLE,
+        generator=GENERATOR_PLACEHOLDER,
+    ))
+
+
+class SiteBuilder:
+    """Builder for the batch pages and the site index."""
+
+    def __init__(self, site_dir=SITE_DIR, brew_log=None, curated_path=CURATED_PATH):
+        """
+        Args:
+            site_dir: Local root of the site
+            brew_log: BrewLog (loaded from brew-log.md if omitted)
+            curated_path: JSON file of curated page copy, keyed by batch slug
+        """
+        self.site_dir = Path(site_dir)
+        self.brew_log = brew_log or BrewLog.load()
+        self.curated = load_curated(curated_path)
+        self.skipped = []
+
+    def _write(self, path, content, force):
+        # Returns True if the page was rewritten. Existing pages without an
+        # intact generator tag are skipped (and noted in self.skipped)
+        # unless forced.
+        if path.exists():
+            existing = path.read_text(encoding='utf-8')
+            if not force and not is_generated(existing):
+                self.skipped.append(path)
+                return False
+            if existing == content:
+                return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+        return True
+
+    def build(self, force=False, year=None):
+        """
+        Bring every batch page and the index up to date.
+
+        Args:
+            force: Also overwrite pages maintained or edited by hand
+            year: Copyright year (default: the current year)
+
+        Returns:
+            List of paths that were written (the pages left alone as hand
+            maintained are in self.skipped)
+        """
+        year = year or datetime.now().year
+        self.skipped = []
+        index = shared_recipe_index()
+        pages = [page_data(slug, self.brew_log, index, self.curated.get(slug))
+                 for slug in self.brew_log.batches()]
+        index.save()
+
+        written = []
+        for data in pages:
+            path = page_path(data['url'], self.site_dir)
+            if self._write(path, render_page(data, year), force):
+                written.append(path)
+
+        path = self.site_dir / 'index.html'
+        if self._write(path, render_index(pages, year), force):
+            written.append(path)
+        return written
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description='Build the batch pages in docs/ from brew-log.md and the recipes'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Also overwrite pages maintained or edited by hand'
+    )
+    parser.add_argument('--site-dir', default=str(SITE_DIR), help='Output directory (default: docs/)')
+    args = parser.parse_args()
+
+    builder = SiteBuilder(site_dir=args.site_dir)
+    written = builder.build(force=args.force)
+    for path in written:
+        print(f"Wrote {path}")
+    for path in builder.skipped:
+        print(f"Skipped hand-maintained page (use --force to overwrite): {path}")
+    print(f"{len(written)} page(s) updated")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the label rendering hot paths.
+
+Times ingredient extraction, QR encoding, ingredient wrapping, back and
+front sheet rendering (over every recipe in recipes/ and over synthetic
+large batches) and CLI startup. Each case records best wall time, peak
+Python heap (as seen by tracemalloc, so C allocations such as MuPDF's
+document buffers are not included) and bytes written. Sheet cases start
+from cold QR, wrapping and recipe caches on every run. Results can be saved
+as a baseline and later runs compared against it to catch regressions.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from recipes import RECIPE_DIRS, extract_ingredients, format_ingredients, load_recipe
+
+
+# CLI startup (interpreter + imports + argument parsing) must stay under this
+STARTUP_BUDGET_MS = 150
+
+BENCH_URL = 'https://andreacampi.github.io/brewery/benchmark/'
+BACK_LABEL_COUNTS = [16, 160, 1600]
+FRONT_COPY_COUNTS = [2, 20, 200]
+
+
+def measure(fn, repeat=5):
+    """
+    Run fn repeatedly and measure it.
+
+    Args:
+        fn: Callable to benchmark; may return a byte count it wrote
+        repeat: Number of timed runs (the first run also traces memory)
+
+    Returns:
+        Dict with best and median wall time (ms), peak Python heap (KiB) and bytes
+    """
+    # Traced run: tracemalloc slows execution, so it is not timed
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        written = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        times.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'best_ms': round(min(times), 3),
+        'median_ms': round(statistics.median(times), 3),
+        'py_heap_kib': round(peak / 1024, 1),
+        'bytes': written,
+    }
+
+
+def recipe_paths():
+    """Return every recipe JSON in the recipe directories."""
+    paths = []
+    for recipe_dir in RECIPE_DIRS:
+        if recipe_dir.is_dir():
+            paths.extend(sorted(recipe_dir.glob('*.json')))
+    return paths
+
+
+def bench_extract_ingredients(paths):
+    def run():
+        load_recipe.cache_clear()
+        for path in paths:
+            extract_ingredients(load_recipe(path))
+    return run
+
+
+def bench_qr_png():
+    from back_labels import BreweryLabelGenerator, QRCodeCache
+
+    generator = _back_generator(BreweryLabelGenerator, recipe_paths()[0])
+
+    def run():
+        generator.qr_cache = QRCodeCache()
+        return len(generator.generate_qr_code(BreweryLabelGenerator.QR_COLORS[0]).getvalue())
+    return run
+
+
+def bench_qr_matrix():
+    from back_labels import BreweryLabelGenerator, qr_matrix
+
+    def run():
+        qr_matrix.cache_clear()
+        qr_matrix(BENCH_URL, BreweryLabelGenerator.QR_ERROR_CORRECTION)
+    return run
+
+
+def bench_wrap(paths):
+    from back_labels import wrap_text
+
+    texts = [format_ingredients(extract_ingredients(load_recipe(p))) for p in paths]
+    # A long synthetic list exercises the per-word cost
+    texts.append(', '.join(texts) * 4)
+
+    def run():
+        wrap_text.cache_clear()
+        for text in texts:
+            wrap_text(text, 'Helvetica', 7, 80.0, 90.0)
+    return run
+
+
+def bench_back_sheet(recipe_path, num_labels, out_dir):
+    from back_labels import BreweryLabelGenerator, QRCodeCache, qr_matrix, wrap_text
+    from recipes import RecipeIndex
+
+    output_path = Path(out_dir) / f"back-{recipe_path.stem}-{num_labels}.pdf"
+
+    def run():
+        # Start cold, like a fresh CLI run; otherwise the earlier runs leave
+        # every QR code, wrapped line and parsed recipe cached
+        qr_matrix.cache_clear()
+        wrap_text.cache_clear()
+        load_recipe.cache_clear()
+        generator = _back_generator(BreweryLabelGenerator, recipe_path,
+                                    qr_cache=QRCodeCache(), recipe_index=RecipeIndex())
+        generator.generate_pdf(output_path, num_labels=num_labels)
+        return output_path.stat().st_size
+    return run
+
+
+def bench_front_sheet(copies, out_dir, font_path):
+    from front_labels import FrontLabelGenerator, LabelResources
+
+    resources = LabelResources(font_path=font_path)
+    output_path = Path(out_dir) / f"front-{copies}.pdf"
+
+    def run():
+        FrontLabelGenerator('Navarino Road', resources=resources).generate_pdf(output_path, copies=copies)
+        return output_path.stat().st_size
+    return run
+
+
+def bench_startup():
+    script = Path(__file__).parent / 'generate_labels.py'
+
+    def run():
+        subprocess.run([sys.executable, str(script), '--help'], check=True, capture_output=True)
+    return run
+
+
+def _back_generator(cls, recipe_path, **kwargs):
+    return cls(
+        batch_name='Benchmark',
+        style='Benchmark Mead',
+        recipe_path=recipe_path,
+        abv='12.34',
+        url=BENCH_URL,
+        lot_number='LOT 999',
+        **kwargs,
+    )
+
+
+def run_benchmarks(repeat=5, font_path=None, quick=False):
+    """
+    Run every benchmark case.
+
+    Args:
+        repeat: Timed runs per case
+        font_path: Font for the front-sheet benchmarks (default: as resolved
+            for labels; skipped if an explicit font is missing)
+        quick: Only use the smallest synthetic batch sizes
+
+    Returns:
+        Dict of case name to measurement
+    """
+    paths = recipe_paths()
+    back_counts = BACK_LABEL_COUNTS[:1] if quick else BACK_LABEL_COUNTS
+    front_counts = FRONT_COPY_COUNTS[:1] if quick else FRONT_COPY_COUNTS
+    results = {}
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        cases = [
+            ('startup/help', bench_startup()),
+            (f'extract_ingredients/{len(paths)}-recipes', bench_extract_ingredients(paths)),
+            ('qr/png', bench_qr_png()),
+            ('qr/matrix', bench_qr_matrix()),
+            (f'wrap/{len(paths) + 1}-texts', bench_wrap(paths)),
+        ]
+        for path in paths:
+            cases.append((f'back/{path.stem}/16', bench_back_sheet(path, 16, out_dir)))
+        for count in back_counts:
+            cases.append((f'back/synthetic/{count}', bench_back_sheet(paths[0], count, out_dir)))
+        if font_path is None or Path(font_path).exists():
+            for copies in front_counts:
+                cases.append((f'front/synthetic/{copies}', bench_front_sheet(copies, out_dir, font_path)))
+        else:
+            print(f"Skipping front-sheet benchmarks: font not found at {font_path}")
+
+        for name, fn in cases:
+            results[name] = measure(fn, repeat=repeat)
+            r = results[name]
+            size = f"{r['bytes']:>10,} B" if r['bytes'] is not None else ''
+            print(f"{name:<44} {r['best_ms']:>10.2f} ms  {r['py_heap_kib']:>10.1f} KiB heap  {size}")
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results with a saved baseline.
+
+    Args:
+        results: Current results
+        baseline: Baseline results (same shape)
+        threshold: Allowed slowdown/growth ratio (e.g. 1.25 = +25%)
+
+    Returns:
+        List of regression descriptions
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in ('best_ms', 'py_heap_kib', 'bytes'):
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            ratio = new / old
+            if ratio > threshold:
+                regressions.append(f"{name} {metric}: {old} -> {new} ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark label rendering hot paths',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  %(prog)s --save .cache/bench-baseline.json
+  %(prog)s --compare .cache/bench-baseline.json
+  %(prog)s --quick --font /usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf
+        '''
+    )
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case (default: 5)')
+    parser.add_argument('--quick', action='store_true', help='Skip the large synthetic batches')
+    parser.add_argument('--font', help='Font for front-sheet benchmarks (default: as for labels)')
+    parser.add_argument('--save', metavar='PATH', help='Write results as JSON')
+    parser.add_argument('--compare', metavar='PATH', help='Compare with a saved baseline')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=1.25,
+        help='Ratio over baseline that counts as a regression (default: 1.25)'
+    )
+
+    args = parser.parse_args()
+
+    results = run_benchmarks(repeat=args.repeat, font_path=args.font, quick=args.quick)
+    status = 0
+
+    startup = results['startup/help']['best_ms']
+    if startup > STARTUP_BUDGET_MS:
+        print(f"Error: CLI startup {startup:.0f} ms exceeds budget of {STARTUP_BUDGET_MS} ms")
+        status = 1
+
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2)
+        print(f"Saved results: {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            status = 1
+        else:
+            print(f"No regressions against {args.compare}")
+
+    return status
+
+
+if __name__ == '__main__':
+    exit(main())
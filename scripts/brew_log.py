@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Parse brew-log.md into structured lot entries and label batch configuration.
+
+The parsed log is cached in .cache/brew-log.json and only re-parsed when the
+log's size, mtime and content hash say it has changed.
+"""
+
+import json
+import hashlib
+import os
+import re
+import unicodedata
+import argparse
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).parent.parent
+BREW_LOG = BASE_DIR / 'brew-log.md'
+CACHE_PATH = BASE_DIR / '.cache' / 'brew-log.json'
+SITE_URL = 'https://andreacampi.github.io/brewery/'
+
+# Bump when the shape of parsed entries changes
+CACHE_VERSION = 2
+
+LOT_HEADING = re.compile(r'^## (LOT \d+[\w-]*): (.+?)\s*$')
+SUBHEADING = re.compile(r'^### (.+?)\s*$')
+FIELD = re.compile(r'^\*\*(.+?)\*\*: (.*?)\s*$')
+STAT = re.compile(r'^- \*\*(.+?)\*\*: (.*?)\s*$')
+VARIANT_ROW = re.compile(r'^\| (LOT [\w-]+) \| ([^|]*?) \|')
+RECIPE_FILE = re.compile(r'`([^`]+\.json)`')
+NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+
+def slugify(name):
+    """
+    Turn a batch name into a URL/file slug.
+
+    Args:
+        name: Display name (e.g., "Navarino Road", "Deorlaf's Tun")
+
+    Returns:
+        Slug (e.g., "navarino-road", "deorlafs-tun")
+    """
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    ascii_name = ascii_name.replace("'", '')
+    return re.sub(r'[^a-z0-9]+', '-', ascii_name.lower()).strip('-')
+
+
+def lot_key(lot_number):
+    """Normalize a lot number for lookups ("lot-098", "LOT 098" -> "LOT 098")."""
+    digits = re.sub(r'^lot[\s_-]*', '', lot_number.strip(), flags=re.IGNORECASE)
+    return f"LOT {digits.upper()}"
+
+
+def resolve_recipe(filename):
+    """
+    Resolve a recipe reference from the log to a repo-relative path.
+
+    Bare file names are looked up in recipes/ first, then in the MiniBrew
+    cache (.cache/recipes/), where community recipes live.
+    """
+    if '/' in filename:
+        return filename
+    if (BASE_DIR / 'recipes' / filename).exists():
+        return f"recipes/{filename}"
+    return f".cache/recipes/{filename}"
+
+
+def parse_brew_log(text):
+    """
+    Parse brew log markdown into lot entries, in file order.
+
+    Args:
+        text: Contents of brew-log.md
+
+    Returns:
+        List of dicts with lot, title, name, slug, style, recipe, abv, ibu,
+        og, fg (as logged in the Stats section), status, brewed, pitch and
+        variants
+    """
+    entries = []
+    entry = None
+    subsection = None
+
+    for line in text.splitlines():
+        m = LOT_HEADING.match(line)
+        if m:
+            entry = {'lot': m.group(1), 'title': m.group(2), 'fields': {}, 'stats': {},
+                     'pitch': [], 'variants': []}
+            entries.append(entry)
+            subsection = None
+            continue
+        if entry is None:
+            continue
+
+        m = SUBHEADING.match(line)
+        if m:
+            subsection = m.group(1)
+            continue
+
+        if subsection is None:
+            m = FIELD.match(line)
+            if m:
+                entry['fields'][m.group(1)] = m.group(2)
+        elif subsection == 'Stats':
+            m = STAT.match(line)
+            if m:
+                entry['stats'][m.group(1)] = m.group(2)
+        elif subsection == 'Pitch':
+            if line.strip() and line.strip() != '---':
+                entry['pitch'].append(line.strip())
+        elif subsection == 'Bottling Variants':
+            m = VARIANT_ROW.match(line)
+            if m:
+                entry['variants'].append({'lot': m.group(1), 'name': m.group(2)})
+
+    return [_finish_entry(e) for e in entries]
+
+
+def _finish_entry(raw):
+    fields = raw['fields']
+    street = fields.get('Street Name', 'TBD')
+    name = raw['title'] if street in ('', 'TBD') else street
+
+    recipe_match = RECIPE_FILE.search(fields.get('Recipe', ''))
+    stats = {}
+    for stat in ('ABV', 'IBU', 'OG', 'FG'):
+        m = NUMBER.search(raw['stats'].get(stat, ''))
+        stats[stat.lower()] = m.group(0) if m else None
+
+    return {
+        'lot': raw['lot'],
+        'title': raw['title'],
+        'name': name,
+        'slug': slugify(name),
+        # Parenthetical qualifiers ("Blackberry Mead (Melomel)") are dropped for labels
+        'style': re.sub(r'\s*\(.*?\)', '', fields.get('Style', '')).strip(),
+        'recipe': resolve_recipe(recipe_match.group(1)) if recipe_match else None,
+        'abv': stats['abv'],
+        'ibu': stats['ibu'],
+        'og': stats['og'],
+        'fg': stats['fg'],
+        'status': fields.get('Status'),
+        'brewed': fields.get('Brewed'),
+        'pitch': ' '.join(raw['pitch']),
+        'variants': raw['variants'],
+    }
+
+
+class BrewLog:
+    """Parsed brew log with O(1) lookups by batch slug and lot number."""
+
+    def __init__(self, entries):
+        """
+        Index parsed entries.
+
+        Args:
+            entries: Entries as returned by parse_brew_log
+        """
+        self.entries = entries
+        self._by_lot = {}
+        self._by_slug = {}
+        for entry in entries:
+            self._by_lot[lot_key(entry['lot'])] = entry
+            for variant in entry['variants']:
+                self._by_lot.setdefault(lot_key(variant['lot']), entry)
+
+            # A street name can be reused; its slug refers to the latest
+            # labelable lot (one with a recipe file)
+            if entry['recipe'] is None:
+                continue
+            current = self._by_slug.get(entry['slug'])
+            if current is None or _lot_order(entry) > _lot_order(current):
+                self._by_slug[entry['slug']] = entry
+
+    @classmethod
+    def load(cls, log_path=BREW_LOG, cache_path=CACHE_PATH):
+        """
+        Load the brew log, reusing the cached parse when the log is unchanged.
+
+        Args:
+            log_path: Path to brew-log.md
+            cache_path: Path of the JSON parse cache (None to disable caching)
+
+        Returns:
+            BrewLog
+        """
+        log_path = Path(log_path)
+        stat = os.stat(log_path)
+        cached = _read_cache(cache_path)
+
+        if cached and cached['mtime'] == stat.st_mtime and cached['size'] == stat.st_size:
+            return cls(cached['entries'])
+
+        data = log_path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if cached and cached['sha256'] == digest:
+            entries = cached['entries']
+        else:
+            entries = parse_brew_log(data.decode('utf-8'))
+
+        if cache_path:
+            _write_cache(cache_path, {
+                'version': CACHE_VERSION,
+                'mtime': stat.st_mtime,
+                'size': stat.st_size,
+                'sha256': digest,
+                'entries': entries,
+            })
+        return cls(entries)
+
+    def batch_config(self, slug):
+        """
+        Return label configuration for a batch slug, or None if unknown.
+
+        Returns:
+            Dict with name, style, recipe, abv, url and lot
+        """
+        entry = self._by_slug.get(slug)
+        return self._config(entry) if entry else None
+
+    def lot_config(self, lot_number):
+        """
+        Return label configuration for a lot or bottling variant number, or None.
+
+        Variants (e.g., "LOT 097-B") share their parent lot's recipe and
+        stats but keep their own lot number on the label.
+        """
+        key = lot_key(lot_number)
+        entry = self._by_lot.get(key)
+        if not entry or not entry['recipe']:
+            return None
+        config = self._config(entry)
+        config['lot'] = key
+        return config
+
+    def slug_for_lot(self, lot_number):
+        """Return the batch slug of a lot or variant number, or None."""
+        entry = self._by_lot.get(lot_key(lot_number))
+        return entry['slug'] if entry else None
+
+    def lots(self, slug):
+        """Return every log entry brewed under a batch slug, latest lot first."""
+        return sorted((e for e in self.entries if e['slug'] == slug), key=_lot_order, reverse=True)
+
+    def batches(self):
+        """Return all labelable batch slugs, latest lot first."""
+        return sorted(self._by_slug, key=lambda s: _lot_order(self._by_slug[s]), reverse=True)
+
+    def _config(self, entry):
+        return {
+            'name': entry['name'],
+            'style': entry['style'],
+            'recipe': entry['recipe'],
+            'abv': entry['abv'],
+            'url': f"{SITE_URL}{entry['slug']}/",
+            'lot': entry['lot'],
+        }
+
+
+def _lot_order(entry):
+    return int(NUMBER.search(entry['lot']).group(0))
+
+
+def _read_cache(cache_path):
+    if not cache_path:
+        return None
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cached if cached.get('version') == CACHE_VERSION else None
+
+
+def _write_cache(cache_path, data):
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    tmp_path.replace(cache_path)
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description='List batches recorded in brew-log.md'
+    )
+    parser.add_argument('lot', nargs='?', help='Show one lot (e.g., "LOT 098" or lot-098)')
+    args = parser.parse_args()
+
+    log = BrewLog.load()
+    if args.lot:
+        config = log.lot_config(args.lot)
+        if not config:
+            print(f"Error: No labelable lot '{args.lot}'")
+            return 1
+        for key, value in config.items():
+            print(f"{key}: {value}")
+        return 0
+
+    for slug in log.batches():
+        config = log.batch_config(slug)
+        print(f"{config['lot']:<9} {slug:<24} {config['style']:<20} {config['abv'] or '?':>6}%  {config['recipe']}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,90 @@
+"""
+Combined print jobs: front and back sheets for many lots in one PDF (PyMuPDF).
+
+Front pages are laid out directly in the combined document, so every copy
+of a lot's front label is a reference to one shared XObject. Back sheets
+are rendered by ReportLab and their pages copied in as-is, without
+re-rendering. When the job is saved, identical objects (the template's
+images, the back sheets' fonts, QR forms) are merged, so each is stored once
+however many lots the job covers. Each lot's front label brings only a
+small subset of the label font, with the glyphs of its street name.
+"""
+
+from pathlib import Path
+
+import fitz  # pymupdf
+
+from front_labels import FrontLabelGenerator
+from render_profile import NULL_PROFILE
+
+
+class CombinedLabelDocument:
+    """A single print-ready PDF assembled from front and back label sheets."""
+
+    def __init__(self, resources=None, profile=None):
+        """
+        Start an empty print job.
+
+        Args:
+            resources: Shared LabelResources for front sheets (loaded on
+                demand if omitted)
+            profile: RenderProfile to record stage timings in (default: off)
+        """
+        self.resources = resources
+        self.profile = profile or NULL_PROFILE
+        self.doc = fitz.open()
+
+    def add_front(self, batch_name, copies=2):
+        """
+        Append a lot's front label sheet(s).
+
+        Args:
+            batch_name: Street name to stamp
+            copies: Number of front labels to generate
+
+        Returns:
+            Number of pages added
+        """
+        generator = FrontLabelGenerator(batch_name, resources=self.resources, profile=self.profile)
+        self.resources = generator.resources
+        return generator.add_pages(self.doc, copies)
+
+    def add_pdf(self, pdf_bytes):
+        """
+        Append every page of an already rendered PDF (e.g. a back sheet).
+
+        Args:
+            pdf_bytes: PDF document as bytes
+
+        Returns:
+            Number of pages added
+        """
+        with self.profile.stage('combined.insert'), fitz.open(stream=pdf_bytes, filetype='pdf') as src:
+            self.doc.insert_pdf(src)
+            return len(src)
+
+    def page_count(self):
+        """Return the number of pages in the job so far."""
+        return len(self.doc)
+
+    def save(self, output):
+        """
+        Write the job, merging duplicate objects across all sheets.
+
+        Args:
+            output: Path to save PDF, or a writable binary stream
+        """
+        if hasattr(output, 'write'):
+            output.write(self.tobytes())
+            return
+        with self.profile.stage('combined.save'):
+            self.doc.save(str(output), garbage=4, deflate=True)
+        self.profile.record_output('combined', Path(output).name, Path(output).stat().st_size,
+                                   len(self.doc))
+
+    def tobytes(self):
+        """Return the job as PDF bytes, without touching disk."""
+        with self.profile.stage('combined.save'):
+            data = self.doc.tobytes(garbage=4, deflate=True)
+        self.profile.record_output('combined', 'combined', len(data), len(self.doc))
+        return data
@@ -0,0 +1,209 @@
+"""
+Front label sheets: the street name stamped onto the label template (PyMuPDF).
+"""
+
+from pathlib import Path
+
+import fitz  # pymupdf
+
+from label_assets import BUILTIN_FONT, LABEL_TEMPLATE, resolve_font
+from render_profile import NULL_PROFILE
+
+
+# Front label text position (top-down PDF coordinates, points)
+FRONT_TEXT_Y = 259
+FRONT_TEXT_FONTSIZE = 14
+FRONT_TEXT_COLOR = (0.102, 0.157, 0.22)  # Navy #1a2838
+
+
+class LabelResources:
+    """Template and font data loaded once and shared by every batch in a run."""
+
+    def __init__(self, template_path=LABEL_TEMPLATE, font_path=None, profile=None):
+        """
+        Load the label template and front label font.
+
+        Args:
+            template_path: Path to the label template PDF
+            font_path: Font file for the street name (default: resolved by
+                label_assets.resolve_font, falling back to built-in Times)
+            profile: RenderProfile to record stage timings in (default: off)
+        """
+        profile = profile or NULL_PROFILE
+        with profile.stage('front.resources'):
+            self.template_bytes = Path(template_path).read_bytes()
+            self.font_path = resolve_font(font_path)
+            if self.font_path is None:
+                self.font_buffer = None
+                self.font = fitz.Font(BUILTIN_FONT)
+            else:
+                self.font_buffer = self.font_path.read_bytes()
+                self.font = fitz.Font(fontbuffer=self.font_buffer)
+
+    def open_template(self):
+        """Return a fresh, writable copy of the label template."""
+        return fitz.open(stream=self.template_bytes, filetype='pdf')
+
+
+class FrontLabelGenerator:
+    """Stamp street name onto the front label template, 2 copies per A4 sheet."""
+
+    # A4 dimensions in points
+    A4_WIDTH = 595.276
+    A4_HEIGHT = 841.89
+
+    # Layout: copies stacked vertically, scaled up slightly from the template
+    COPIES_PER_PAGE = 2
+    LABEL_SCALE = 1.10
+    LABEL_GAP = 10  # points between labels
+
+    def __init__(self, batch_name, resources=None, profile=None):
+        """
+        Initialize the front label generator.
+
+        Args:
+            batch_name: Street name to stamp (e.g., "Navarino Road")
+            resources: Shared LabelResources (loaded on demand if omitted)
+            profile: RenderProfile to record stage timings in (default: off)
+        """
+        self.batch_name = batch_name
+        self.profile = profile or NULL_PROFILE
+        self.resources = resources or LabelResources(profile=self.profile)
+        self._stamped = None
+
+    def stamped_template(self):
+        """
+        Return the template with the street name stamped on it.
+
+        The stamp is applied once per generator. Every placement on every page
+        shows this same document, so PyMuPDF grafts it into the output as a
+        single Form XObject (with one copy of its fonts and images) and each
+        copy is just a reference to it.
+
+        The embedded font is subset to the glyphs of the street name, so each
+        document carries a few KB of font data instead of the whole TTF.
+        """
+        if self._stamped is not None:
+            return self._stamped
+
+        with self.profile.stage('front.template_load'):
+            template = self.resources.open_template()
+            label_page = template[0]
+            lw = label_page.rect.width
+
+        # Stamp the street name on the template
+        with self.profile.stage('front.font_embed'):
+            font = self.resources.font
+            tw = font.text_length(self.batch_name, fontsize=FRONT_TEXT_FONTSIZE)
+            x = (lw - tw) / 2
+            if self.resources.font_buffer is None:
+                fontname = BUILTIN_FONT
+            else:
+                fontname = 'LabelFont'
+                label_page.insert_font(fontname=fontname, fontbuffer=self.resources.font_buffer)
+            label_page.insert_text(
+                (x, FRONT_TEXT_Y),
+                self.batch_name,
+                fontname=fontname,
+                fontsize=FRONT_TEXT_FONTSIZE,
+                color=FRONT_TEXT_COLOR,
+            )
+        if self.resources.font_buffer is not None:
+            with self.profile.stage('front.font_subset'):
+                template.subset_fonts()
+            self.profile.count('font_embeds')
+        self._stamped = template
+        return template
+
+    def label_rects(self, label_width, label_height):
+        """
+        Return the placement rectangles for one A4 page.
+
+        Args:
+            label_width: Template page width in points
+            label_height: Template page height in points
+        """
+        scaled_w = label_width * self.LABEL_SCALE
+        scaled_h = label_height * self.LABEL_SCALE
+        n = self.COPIES_PER_PAGE
+
+        # Centre vertically, distributing remaining space as top/bottom margin
+        margin = (self.A4_HEIGHT - n * scaled_h - (n - 1) * self.LABEL_GAP) / 2
+        x_left = (self.A4_WIDTH - scaled_w) / 2
+        rects = []
+        for i in range(n):
+            y_top = margin + i * (scaled_h + self.LABEL_GAP)
+            rects.append(fitz.Rect(x_left, y_top, x_left + scaled_w, y_top + scaled_h))
+        return rects
+
+    def add_pages(self, doc, copies=2):
+        """
+        Append front label pages to a document, 2 labels per A4 page.
+
+        All copies reference one XObject per target document, so appending to
+        a shared document (e.g. a combined print job) adds no per-copy data.
+
+        Args:
+            doc: PyMuPDF document to append pages to
+            copies: Number of front labels to generate
+
+        Returns:
+            Number of pages added
+        """
+        template = self.stamped_template()
+        label_rect = template[0].rect
+        rects = self.label_rects(label_rect.width, label_rect.height)
+
+        pages = 0
+        placed = 0
+        with self.profile.stage('front.layout'):
+            while placed < copies:
+                page = doc.new_page(width=self.A4_WIDTH, height=self.A4_HEIGHT)
+                pages += 1
+                for rect in rects[:copies - placed]:
+                    page.show_pdf_page(rect, template, 0)
+                    placed += 1
+        self.profile.count('template_placements', placed)
+        return pages
+
+    def build_document(self, copies=2):
+        """
+        Lay out any number of front labels, 2 per A4 page.
+
+        Args:
+            copies: Number of front labels to generate
+
+        Returns:
+            In-memory PyMuPDF document
+        """
+        out = fitz.open()
+        self.add_pages(out, copies)
+        return out
+
+    def generate_pdf(self, output, copies=2):
+        """
+        Generate PDF with any number of front labels, 2 per A4 page.
+
+        Args:
+            output: Path to save PDF, or a writable binary stream
+            copies: Number of front labels to generate
+        """
+        out = self.build_document(copies)
+        if hasattr(output, 'write'):
+            output.write(self._tobytes(out))
+            return
+
+        with self.profile.stage('front.save'):
+            out.save(str(output), garbage=3, deflate=True)
+        self.profile.record_output('front', self.batch_name, Path(output).stat().st_size, len(out))
+        print(f"Generated {copies} front labels on {len(out)} page(s): {output}")
+
+    def render_bytes(self, copies=2):
+        """Render the front sheet and return the PDF as bytes, without touching disk."""
+        return self._tobytes(self.build_document(copies))
+
+    def _tobytes(self, out):
+        with self.profile.stage('front.save'):
+            data = out.tobytes(garbage=3, deflate=True)
+        self.profile.record_output('front', self.batch_name, len(data), len(out))
+        return data
@@ -5,411 +5,584 @@ Bottle Label Generator for Dalston Rooftop Brewery
 Generates front and back bottle labels:
 - Front: street name stamped on template PDF, 2 copies per A4 sheet
 - Back: 4cm x 6cm labels with ingredients, ABV, and QR code, 16 per A4 sheet
+
+The renderers live in front_labels (PyMuPDF) and back_labels (ReportLab) and
+are only imported when a sheet of that kind is actually rendered, so --help,
+--list, argument errors and up-to-date runs never load a PDF library.
 """
 
-import json
-import re
 import argparse
+import hashlib
+import json
+import os
+import time
+from fnmatch import fnmatch
 from pathlib import Path
-from io import BytesIO
-
-import fitz  # pymupdf
-
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import mm
-from reportlab.lib.colors import HexColor
-from reportlab.lib.utils import ImageReader
-import qrcode
-
-
-ASSETS_DIR = Path(__file__).parent.parent / 'assets'
-LABEL_TEMPLATE = ASSETS_DIR / 'label-template.pdf'
-GEORGIA_FONT = Path('/System/Library/Fonts/Supplemental/Georgia.ttf')
-
-# Front label text position (top-down PDF coordinates, points)
-FRONT_TEXT_Y = 259
-FRONT_TEXT_FONTSIZE = 14
-FRONT_TEXT_COLOR = (0.102, 0.157, 0.22)  # Navy #1a2838
-
-
-class FrontLabelGenerator:
-    """Stamp street name onto the front label template, 2 copies per A4 sheet."""
-
-    # A4 dimensions in points
-    A4_WIDTH = 595.276
-    A4_HEIGHT = 841.89
-
-    def __init__(self, batch_name):
-        self.batch_name = batch_name
-
-    def generate_pdf(self, output_path):
-        template = fitz.open(str(LABEL_TEMPLATE))
-        label_page = template[0]
-        lw = label_page.rect.width
-        lh = label_page.rect.height
-
-        # Stamp the street name on the template
-        font = fitz.Font(fontfile=str(GEORGIA_FONT))
-        tw = font.text_length(self.batch_name, fontsize=FRONT_TEXT_FONTSIZE)
-        x = (lw - tw) / 2
-        label_page.insert_font(fontname='Georgia', fontfile=str(GEORGIA_FONT))
-        label_page.insert_text(
-            (x, FRONT_TEXT_Y),
-            self.batch_name,
-            fontname='Georgia',
-            fontsize=FRONT_TEXT_FONTSIZE,
-            color=FRONT_TEXT_COLOR,
-        )
-
-        # Place 2 copies stacked vertically on A4
-        out = fitz.open()
-        page = out.new_page(width=self.A4_WIDTH, height=self.A4_HEIGHT)
-
-        scale = 1.10
-        scaled_w = lw * scale
-        scaled_h = lh * scale
-
-        gap = 10  # points between labels
-        # Centre vertically, distributing remaining space as top/bottom margin
-        margin = (self.A4_HEIGHT - 2 * scaled_h - gap) / 2
-        x_left = (self.A4_WIDTH - scaled_w) / 2
-        for i in range(2):
-            y_top = margin + i * (scaled_h + gap)
-            rect = fitz.Rect(x_left, y_top, x_left + scaled_w, y_top + scaled_h)
-            page.show_pdf_page(rect, template, 0)
-
-        out.save(str(output_path))
-        print(f"Generated front labels: {output_path}")
-
-
-class BreweryLabelGenerator:
-    """Generate bottle labels for Dalston Rooftop Brewery."""
-
-    # Brand colors
-    NAVY_BLUE = HexColor('#1a2838')
-    WARM_BEIGE = HexColor('#d4c5a9')
-    SUNSET_ORANGE = HexColor('#ff8c42')
-    DARK_GRAY = HexColor('#2a2a2a')
-
-    # QR code color palette (warm colors from brewery branding)
-    QR_COLORS = [
-        '#ff8c42',  # Sunset orange
-        '#ffb366',  # Lighter orange
-        '#ffa94d',  # Medium orange
-        '#d4a574',  # Light brown
-        '#c9a772',  # Tan
-        '#d4c5a9',  # Warm beige
-        '#e6c79c',  # Pale tan
-        '#ffcc80',  # Light orange/peach
-    ]
-
-    # QR code color mode: 'single' or 'cycle'
-    QR_COLOR_MODE = 'single'  # Set to 'cycle' to rotate through palette
-    QR_SINGLE_COLOR_INDEX = 7  # Index in QR_COLORS (7 = #ffcc80, light orange/peach)
-
-    # Label dimensions (in points, 1mm = 2.834645669 points)
-    LABEL_WIDTH = 40 * mm
-    LABEL_HEIGHT = 60 * mm
-    MARGIN = 2 * mm  # Reduced from 5mm
-    GAP = 10 * mm
-    HEADER_HEIGHT = 8 * mm  # Reduced from 10mm
-
-    def __init__(self, batch_name, style, recipe_path, abv, url, lot_number=None):
-        """
-        Initialize the label generator.
-
-        Args:
-            batch_name: Display name of the batch (e.g., "Navarino Road")
-            style: Style of the brew (e.g., "Hibiscus Mead")
-            recipe_path: Path to recipe JSON file
-            abv: ABV percentage as string (e.g., "11.81")
-            url: URL to the product page
-            lot_number: Lot number (e.g., "LOT 098" or "LOT 098-A")
-        """
-        self.batch_name = batch_name
-        self.style = style
-        self.recipe_path = Path(recipe_path)
-        self.abv = abv
-        self.url = url
-        self.lot_number = lot_number
-        self.ingredients = self.extract_ingredients()
-
-    def extract_ingredients(self):
-        """
-        Parse recipe JSON and extract ingredients, applying marketing filters.
-
-        Returns:
-            Formatted ingredient string (e.g., "Honey, hibiscus, ginger, cinnamon.")
-        """
-        with open(self.recipe_path, 'r') as f:
-            recipe = json.load(f)
-
-        ingredients = []
-
-        # Extract from mashing section
-        for mash in recipe.get('mashing', []):
-            for ing in mash.get('ingredient_additions', []):
-                name = ing['ingredient_name']
-                if self._should_include_ingredient(name):
-                    ingredients.append(self._clean_ingredient_name(name))
-
-        # Extract from fermenting section (yeast)
-        for ferment in recipe.get('fermenting', []):
-            for yeast in ferment.get('yeast', []):
-                name = yeast['ingredient_name']
-                if self._should_include_ingredient(name):
-                    ingredients.append(self._clean_ingredient_name(name))
-
-        # Extract from while_fermenting (dry hops, adjuncts)
-        while_ferm = recipe.get('while_fermenting', {})
-        for ing in while_ferm.get('other_ingredients', []):
-            name = ing['ingredient_name']
-            if self._should_include_ingredient(name):
-                ingredients.append(self._clean_ingredient_name(name))
-
-        # Format as lowercase, comma-separated with period
-        if ingredients:
-            return ', '.join(ingredients).lower() + '.'
-        return ''
-
-    def _should_include_ingredient(self, name):
-        """
-        Check if ingredient should be included per marketing rules.
-
-        Marketing rules:
-        - Skip water (implicit in all recipes)
-        - Skip yeast nutrients
-        - Skip fining agents
-        - Skip yeast (implicit)
 
-        Args:
-            name: Ingredient name
-
-        Returns:
-            True if ingredient should be included
-        """
-        name_lower = name.lower()
-
-        # Skip water
-        if 'water' in name_lower:
-            return False
-
-        # Skip yeast nutrients
-        if 'nutrient' in name_lower:
-            return False
-
-        # Skip fining agents
-        fining_agents = ['bentonite', 'gelatin', 'isinglass', 'calcium bentonite']
-        if any(agent in name_lower for agent in fining_agents):
-            return False
+from brew_log import BrewLog
+from label_assets import BUILTIN_FONT, LABEL_TEMPLATE, QR_CACHE_DIR, resolve_font
+from recipes import INGREDIENT_RULES, batch_abv, shared_recipe_index
 
-        # Skip yeast (implicit in all fermented beverages)
-        if 'yeast' in name_lower:
-            return False
+# Renderer classes re-exported lazily (see __getattr__)
+_LAZY_EXPORTS = {
+    'FrontLabelGenerator': 'front_labels',
+    'LabelResources': 'front_labels',
+    'BreweryLabelGenerator': 'back_labels',
+    'QRCodeCache': 'back_labels',
+}
 
-        # Skip processing aids (enzymes, etc.)
-        if 'enzyme' in name_lower:
-            return False
 
-        return True
+def __getattr__(name):
+    """Import renderer classes on first access (PEP 562)."""
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(__import__(module), name)
 
-    def _clean_ingredient_name(self, name):
-        """
-        Clean up ingredient name by removing obvious processing details.
-        Keep descriptive details that add flavor context.
 
-        Args:
-            name: Raw ingredient name
+def output_path_for(output_dir, sheet, slug):
+    """Return the PDF path for a batch's 'front' or 'back' sheet."""
+    if sheet == 'front':
+        return output_dir / f"{slug}-front-labels.pdf"
+    return output_dir / f"{slug}-labels.pdf"
 
-        Returns:
-            Cleaned ingredient name
-        """
-        # Remove all parenthetical annotations (processing details, quantities, etc.)
-        clean_name = re.sub(r'\s*\(.*?\)', '', name).strip()
 
-        return clean_name
+class BuildManifest:
+    """
+    Record of the inputs behind each generated PDF, for incremental rebuilds.
 
-    def generate_qr_code(self, color="#ff8c42"):
-        """
-        Generate QR code image for URL.
+    Stored as manifest.json next to the PDFs. Each output maps to a hash of
+    everything it was rendered from (batch config, options, recipe, template,
+    font, ingredient rules and the generator code). File hashes are cached by
+    mtime and size, so checking an unchanged tree reads no file contents.
+    """
 
-        Args:
-            color: Hex color for QR code (default: sunset orange)
+    VERSION = 1
 
-        Returns:
-            BytesIO buffer containing PNG image
-        """
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=1,
-        )
-        qr.add_data(self.url)
-        qr.make(fit=True)
-
-        # Convert to BytesIO for ReportLab ImageReader
-        img = qr.make_image(fill_color=color, back_color="white")
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        return buffer
-
-    def draw_page_header(self, c):
+    def __init__(self, output_dir):
         """
-        Draw page header at top of A4 page for tracking.
+        Load the manifest for an output directory.
 
         Args:
-            c: ReportLab canvas
+            output_dir: Directory holding the generated PDFs
         """
-        width, height = A4
-
-        # Header text
-        c.setFillColor(self.NAVY_BLUE)
-        c.setFont("Helvetica-Bold", 12)
-        header_text = f"🍯 {self.batch_name} ({self.style})"
-        text_width = c.stringWidth(header_text, "Helvetica-Bold", 12)
-        x = (width - text_width) / 2
-        y = height - self.MARGIN + 5 * mm
-        c.drawString(x, y, header_text)
-
-    def draw_label(self, c, x, y, label_index=0):
+        self.path = Path(output_dir) / 'manifest.json'
+        self.files = {}
+        self.outputs = {}
+        self.dirty = False
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == self.VERSION:
+            self.files = data.get('files', {})
+            self.outputs = data.get('outputs', {})
+
+    def file_digest(self, path):
+        """Return the SHA-256 of a file, reusing the cached hash if it is unchanged."""
+        path = Path(path)
+        stat = os.stat(path)
+        cached = self.files.get(str(path))
+        if cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+            return cached[2]
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        self.files[str(path)] = [stat.st_mtime, stat.st_size, digest]
+        self.dirty = True
+        return digest
+
+    def task_digest(self, sheet, config, options):
         """
-        Draw a single label at position (x, y).
+        Hash the inputs of one sheet.
 
         Args:
-            c: ReportLab canvas
-            x: X position (bottom-left corner)
-            y: Y position (bottom-left corner)
-            label_index: Index of this label (for color rotation)
+            sheet: 'front' or 'back'
+            config: Batch configuration entry
+            options: Render options shared by every task in the run
         """
-        # Draw border (light cutting guide)
-        c.setStrokeColor(self.WARM_BEIGE)
-        c.setLineWidth(0.5)
-        c.rect(x, y, self.LABEL_WIDTH, self.LABEL_HEIGHT)
-
-        # Ingredients section
-        y_pos = y + self.LABEL_HEIGHT - 8 * mm
-
-        # Combine "Ingredients: " with the ingredient list on same line
-        c.setFillColor(self.NAVY_BLUE)
-        c.setFont("Helvetica-Bold", 8)
-        label_text = "Ingredients: "
-        label_width = c.stringWidth(label_text, "Helvetica-Bold", 8)
-        c.drawString(x + 5 * mm, y_pos, label_text)
-
-        # Draw ingredients continuing on same line
-        c.setFillColor(self.DARK_GRAY)
-        c.setFont("Helvetica", 7)
-
-        # Simple text wrapping, starting after "Ingredients: " label
-        max_width_first = self.LABEL_WIDTH - 10 * mm - label_width
-        max_width = self.LABEL_WIDTH - 10 * mm
-        words = self.ingredients.split()
-        lines = []
-        current_line = []
-        first_line = True
-
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            current_max = max_width_first if first_line else max_width
-            if c.stringWidth(test_line, "Helvetica", 7) <= current_max:
-                current_line.append(word)
-            else:
-                if current_line:
-                    lines.append(' '.join(current_line))
-                    first_line = False
-                current_line = [word]
-
-        if current_line:
-            lines.append(' '.join(current_line))
-
-        x_offset = x + 5 * mm + label_width
-        for i, line in enumerate(lines):
-            if i == 0:
-                # First line continues after "Ingredients: "
-                c.drawString(x_offset, y_pos, line)
-            else:
-                # Subsequent lines start at left margin - reduced spacing
-                y_pos -= 2.5 * mm
-                c.drawString(x + 5 * mm, y_pos, line)
-
-        # ABV - more space before, bold label to match Ingredients
-        y_pos -= 4 * mm
-        c.setFillColor(self.NAVY_BLUE)
-        c.setFont("Helvetica-Bold", 8)
-        abv_label = "ABV: "
-        abv_label_width = c.stringWidth(abv_label, "Helvetica-Bold", 8)
-        c.drawString(x + 5 * mm, y_pos, abv_label)
-
-        c.setFillColor(self.DARK_GRAY)
-        c.setFont("Helvetica", 7)
-        c.drawString(x + 5 * mm + abv_label_width, y_pos, f"{self.abv}%")
-
-        # Lot Number - if provided
-        if self.lot_number:
-            y_pos -= 3 * mm
-            c.setFillColor(self.NAVY_BLUE)
-            c.setFont("Helvetica-Bold", 8)
-            lot_label = "Lot: "
-            lot_label_width = c.stringWidth(lot_label, "Helvetica-Bold", 8)
-            c.drawString(x + 5 * mm, y_pos, lot_label)
-
-            c.setFillColor(self.DARK_GRAY)
-            c.setFont("Helvetica", 7)
-            c.drawString(x + 5 * mm + lot_label_width, y_pos, self.lot_number)
-
-        # QR Code - use color from palette
-        if self.QR_COLOR_MODE == 'cycle':
-            qr_color = self.QR_COLORS[label_index % len(self.QR_COLORS)]
+        scripts_dir = Path(__file__).parent
+        renderer = 'front_labels.py' if sheet == 'front' else 'back_labels.py'
+        inputs = {
+            'sheet': sheet,
+            'config': config,
+            'code': [self.file_digest(scripts_dir / name)
+                     for name in ('generate_labels.py', 'label_assets.py', 'recipes.py',
+                                  'recipe_stats.py', renderer)],
+        }
+        if sheet == 'front':
+            inputs['copies'] = options['front_copies']
+            inputs['template'] = self.file_digest(LABEL_TEMPLATE)
+            inputs['font'] = self.file_digest(options['font']) if options['font'] else BUILTIN_FONT
         else:
-            qr_color = self.QR_COLORS[self.QR_SINGLE_COLOR_INDEX]
-        qr_buffer = self.generate_qr_code(color=qr_color)
-        qr_img = ImageReader(qr_buffer)
-        qr_size = 32 * mm  # Increased from 25mm
-        qr_x = x + (self.LABEL_WIDTH - qr_size) / 2
-        qr_y = y + 5 * mm
-        c.drawImage(qr_img, qr_x, qr_y, width=qr_size, height=qr_size)
-
-    def generate_pdf(self, output_path, num_labels=16):
+            base_dir = Path(__file__).parent.parent
+            inputs['options'] = {k: options[k] for k in ('num_labels', 'lot_number', 'qr_mode')}
+            inputs['recipe'] = self.file_digest(base_dir / config['recipe'])
+            inputs['rules'] = self.file_digest(INGREDIENT_RULES)
+        encoded = json.dumps(inputs, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def job_digest(self, sheet_digests, order):
         """
-        Generate PDF with multiple labels on A4.
+        Hash the inputs of a combined print job.
 
         Args:
-            output_path: Path to save PDF
-            num_labels: Number of labels to generate (max 16 per page)
+            sheet_digests: task_digest() of every sheet, in page order
+            order: 'sheets' or 'lots'
         """
-        c = canvas.Canvas(str(output_path), pagesize=A4)
-        width, height = A4
+        scripts_dir = Path(__file__).parent
+        inputs = {
+            'order': order,
+            'sheets': sheet_digests,
+            'code': self.file_digest(scripts_dir / 'combined_labels.py'),
+        }
+        encoded = json.dumps(inputs, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def is_current(self, output_path, digest):
+        """Return True if output_path exists and was built from these inputs."""
+        return self.outputs.get(Path(output_path).name) == digest and Path(output_path).exists()
+
+    def record(self, output_path, digest):
+        """Note that output_path was just built from these inputs."""
+        self.outputs[Path(output_path).name] = digest
+        self.dirty = True
+
+    def save(self):
+        """Write the manifest back to disk if anything changed."""
+        if not self.dirty:
+            return
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': self.VERSION, 'files': self.files, 'outputs': self.outputs},
+                      f, indent=2, sort_keys=True)
+        tmp_path.replace(self.path)
+        self.dirty = False
+
+
+def render_sheet(sheet, config, output=None, resources=None, copies=2, num_labels=16,
+                 lot_number=None, qr_cache=None, qr_mode=None, profile=None):
+    """
+    Render one label sheet for a batch, to a file, a stream or memory.
+
+    Nothing is written to disk unless output is a path, so a service can
+    return the PDF directly (e.g. as an HTTP response body).
+
+    Args:
+        sheet: 'front' or 'back'
+        config: Batch configuration entry
+        output: Path, writable binary stream, or None to return bytes
+        resources: Shared LabelResources (front sheets only)
+        copies: Number of front labels to generate
+        num_labels: Number of back labels to generate
+        lot_number: Lot number override (defaults to the configured lot)
+        qr_cache: QRCodeCache shared across batches
+        qr_mode: QR render mode override ('vector' or 'raster')
+        profile: RenderProfile to record stage timings in (default: off)
+
+    Returns:
+        PDF bytes when output is None, otherwise None
+    """
+    if sheet == 'front':
+        from front_labels import FrontLabelGenerator
+
+        generator = FrontLabelGenerator(config['name'], resources=resources, profile=profile)
+        if output is None:
+            return generator.render_bytes(copies=copies)
+        generator.generate_pdf(output, copies=copies)
+        return None
+
+    from back_labels import BreweryLabelGenerator
 
-        # Draw page header
-        self.draw_page_header(c)
+    base_dir = Path(__file__).parent.parent
+    recipe_path = base_dir / config['recipe']
 
-        # Calculate grid layout (4 columns x 4 rows)
-        labels_per_row = 4
-        labels_per_col = 4
+    generator = BreweryLabelGenerator(
+        batch_name=config['name'],
+        style=config['style'],
+        recipe_path=recipe_path,
+        abv=batch_abv(config),
+        url=config['url'],
+        # Lot number override wins over the configured lot
+        lot_number=lot_number or config.get('lot'),
+        qr_cache=qr_cache,
+        qr_mode=qr_mode,
+        profile=profile,
+    )
+    if output is None:
+        return generator.render_bytes(num_labels=num_labels)
+    generator.generate_pdf(output, num_labels=num_labels)
+    return None
+
+
+def render_front(slug, config, output_dir, resources, copies=2, profile=None):
+    """
+    Render the front label sheet for one batch.
+
+    Args:
+        slug: Batch slug, used for the output file name
+        config: Batch configuration entry
+        output_dir: Directory to write the PDF into
+        resources: Shared LabelResources
+        copies: Number of front labels to generate
+        profile: RenderProfile to record stage timings in (default: off)
+    """
+    render_sheet('front', config, output_path_for(output_dir, 'front', slug),
+                 resources=resources, copies=copies, profile=profile)
+
+
+def render_back(slug, config, output_dir, num_labels=16, lot_number=None,
+                qr_cache=None, qr_mode=None, profile=None):
+    """
+    Render the back label sheet for one batch.
+
+    Args:
+        slug: Batch slug, used for the output file name
+        config: Batch configuration entry
+        output_dir: Directory to write the PDF into
+        num_labels: Number of back labels to generate
+        lot_number: Lot number override (defaults to the configured lot)
+        qr_cache: QRCodeCache shared across batches
+        qr_mode: QR render mode override ('vector' or 'raster')
+        profile: RenderProfile to record stage timings in (default: off)
+    """
+    render_sheet('back', config, output_path_for(output_dir, 'back', slug),
+                 num_labels=num_labels, lot_number=lot_number,
+                 qr_cache=qr_cache, qr_mode=qr_mode, profile=profile)
+
+
+def combined_plan(slugs, sheets, order='sheets'):
+    """
+    Return the (sheet, slug) pairs of a combined job in page order.
+
+    Args:
+        slugs: Batch slugs, in output order
+        sheets: Sheet kinds to include ('front', 'back')
+        order: 'sheets' for every front sheet then every back sheet, or
+            'lots' to interleave each lot's front and back sheets
+    """
+    if order == 'lots':
+        return [(sheet, slug) for slug in slugs for sheet in sheets]
+    return [(sheet, slug) for sheet in sheets for slug in slugs]
+
+
+def render_combined(plan, batch_config, output=None, resources=None, front_copies=2,
+                    num_labels=16, lot_number=None, qr_cache=None, qr_mode=None, profile=None):
+    """
+    Render many sheets into one print-ready PDF.
+
+    Args:
+        plan: (sheet, slug) pairs in page order (see combined_plan)
+        batch_config: Mapping of slug to batch configuration
+        output: Path, writable binary stream, or None to return bytes
+        resources: Shared LabelResources (loaded on demand if omitted)
+        front_copies: Number of front labels per lot
+        num_labels: Number of back labels per lot
+        lot_number: Lot number override (single-batch jobs only)
+        qr_cache: QRCodeCache shared across batches
+        qr_mode: QR render mode override ('vector' or 'raster')
+        profile: RenderProfile to record stage timings in (default: off)
+
+    Returns:
+        PDF bytes when output is None, otherwise None
+    """
+    from combined_labels import CombinedLabelDocument
+
+    job = CombinedLabelDocument(resources, profile=profile)
+    for sheet, slug in plan:
+        config = batch_config[slug]
+        if sheet == 'front':
+            job.add_front(config['name'], copies=front_copies)
+        else:
+            job.add_pdf(render_sheet('back', config, num_labels=num_labels, lot_number=lot_number,
+                                     qr_cache=qr_cache, qr_mode=qr_mode, profile=profile))
+
+    if output is None:
+        return job.tobytes()
+    job.save(output)
+    if not hasattr(output, 'write'):
+        print(f"Generated combined labels for {len({slug for _, slug in plan})} batch(es) "
+              f"on {job.page_count()} page(s): {output}")
+    return None
+
+
+# Per-process render state: the template and fonts are loaded on the first
+# front sheet a process renders, the QR cache on the first back sheet, and
+# both stay warm for the rest of the run
+_WORKER_STATE = {}
+
+
+def _init_worker(qr_cache_dir=None, profile=False):
+    """Set up render state in this process (pool initializer)."""
+    _WORKER_STATE.clear()
+    _WORKER_STATE['qr_cache_dir'] = qr_cache_dir
+    _WORKER_STATE['profile'] = profile
+
+
+def _run_task(task):
+    """
+    Render one sheet, in the current process or a pool worker.
+
+    Failures are re-raised as a RuntimeError naming the original exception
+    type, since PyMuPDF exceptions can hold SWIG objects that cannot be
+    pickled back from a worker.
+
+    Args:
+        task: Tuple of (sheet, slug, config, output_dir, options) where sheet
+            is 'front' or 'back'
+
+    Returns:
+        Tuple of (sheet, slug, profile) where profile is the task's
+        RenderProfile.to_dict(), or None when profiling is off
+    """
+    try:
+        return _render_task(task)
+    except Exception as e:
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+
+def _render_task(task):
+    sheet, slug, config, output_dir, options = task
+    profile = None
+    if _WORKER_STATE.get('profile'):
+        from render_profile import RenderProfile
+        profile = RenderProfile()
+
+    if sheet == 'front':
+        if 'resources' not in _WORKER_STATE:
+            from front_labels import LabelResources
+            _WORKER_STATE['resources'] = LabelResources(font_path=options['font'], profile=profile)
+        render_front(slug, config, output_dir, _WORKER_STATE['resources'],
+                     copies=options['front_copies'], profile=profile)
+    else:
+        if 'qr_cache' not in _WORKER_STATE:
+            from back_labels import QR_CACHE, QRCodeCache
+            qr_cache_dir = _WORKER_STATE.get('qr_cache_dir')
+            _WORKER_STATE['qr_cache'] = QRCodeCache(cache_dir=qr_cache_dir) if qr_cache_dir else QR_CACHE
+        render_back(slug, config, output_dir,
+                    num_labels=options['num_labels'],
+                    lot_number=options['lot_number'],
+                    qr_cache=_WORKER_STATE['qr_cache'],
+                    qr_mode=options['qr_mode'],
+                    profile=profile)
+    return sheet, slug, profile.to_dict() if profile else None
+
+
+def run_tasks(tasks, jobs=1, qr_cache_dir=None, profile=None):
+    """
+    Render sheets serially or across a process pool.
+
+    Output paths depend only on the batch slug and sheet, so the result is
+    the same whatever the job count or completion order.
+
+    Args:
+        tasks: Task tuples as accepted by _run_task
+        jobs: Number of worker processes (1 = render in this process)
+        qr_cache_dir: Directory for the persistent QR cache, if any
+        profile: RenderProfile that collects every task's timings (default: off)
+
+    Returns:
+        List of (sheet, slug) pairs that rendered successfully
+    """
+    done = []
+
+    def finish(result):
+        sheet, slug, data = result
+        if profile is not None and data:
+            profile.merge(data)
+        done.append((sheet, slug))
+
+    def failed(sheet, slug, error):
+        print(f"Error: Failed to render {sheet} labels for '{slug}': {error}")
+
+    if jobs <= 1:
+        _init_worker(qr_cache_dir, profile is not None)
+        for task in tasks:
+            try:
+                finish(_run_task(task))
+            except Exception as e:
+                failed(task[0], task[1], e)
+        return done
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(qr_cache_dir, profile is not None)) as pool:
+        futures = {pool.submit(_run_task, task): task for task in tasks}
+        for future in as_completed(futures):
+            sheet, slug = futures[future][:2]
+            try:
+                finish(future.result())
+            except Exception as e:
+                failed(sheet, slug, e)
+    return done
+
+
+def select_batches(patterns, batch_config):
+    """
+    Resolve batch slugs and glob patterns against the batch configuration.
+
+    Args:
+        patterns: Slugs or glob patterns (e.g., "navarino-road", "col*")
+        batch_config: Mapping of slug to batch configuration
+
+    Returns:
+        Tuple of (matched slugs in order, patterns that matched nothing)
+    """
+    selected = []
+    unknown = []
+    for pattern in patterns:
+        matches = [slug for slug in batch_config if fnmatch(slug, pattern)]
+        if not matches:
+            unknown.append(pattern)
+        for slug in matches:
+            if slug not in selected:
+                selected.append(slug)
+    return selected, unknown
+
+
+def build_site(brew_log):
+    """
+    Rebuild the batch pages from the same brew log the labels were rendered from.
+
+    Returns:
+        Exit status
+    """
+    from batch_pages import SiteBuilder
+
+    builder = SiteBuilder(brew_log=brew_log)
+    written = builder.build()
+    for path in written:
+        print(f"Updated page: {path}")
+    for path in builder.skipped:
+        print(f"Skipped hand-maintained page: {path}")
+    if not written:
+        print("Batch pages are up to date")
+    return 0
 
-        # Adjust top margin to account for header
-        top_margin = self.MARGIN + self.HEADER_HEIGHT
 
-        label_count = 0
-        for row in range(labels_per_col):
-            for col in range(labels_per_row):
-                if label_count >= num_labels:
-                    break
+def write_combined(args, slugs, batch_config, sheets, options, output_dir, manifest, profile=None):
+    """
+    Render the selected batches into one combined PDF (the --combine mode).
 
-                x = self.MARGIN + col * (self.LABEL_WIDTH + self.GAP)
-                y = height - top_margin - (row + 1) * self.LABEL_HEIGHT - row * self.GAP
+    Batches whose recipe is missing are left out. The job is skipped when
+    none of its sheets' inputs changed, and is rendered in this process,
+    since its pages all go into one document.
+
+    Returns:
+        Exit status
+    """
+    base_dir = Path(__file__).parent.parent
+    output_path = Path(args.output) if args.output else output_dir / 'combined-labels.pdf'
+
+    status = 0
+    available = []
+    for slug in slugs:
+        recipe_path = base_dir / batch_config[slug]['recipe']
+        if not recipe_path.exists():
+            print(f"Error: Recipe not found for '{slug}': {recipe_path}")
+            status = 1
+            continue
+        shared_recipe_index().lookup(recipe_path)
+        available.append(slug)
+    shared_recipe_index().save()
+    if not available:
+        return status
+
+    order = args.order or 'sheets'
+    plan = combined_plan(available, sheets, order=order)
+    digest = manifest.job_digest(
+        [manifest.task_digest(sheet, batch_config[slug], options) for sheet, slug in plan],
+        order,
+    )
+    if not args.force and manifest.is_current(output_path, digest):
+        print(f"Skipped up-to-date combined labels (use --force to rebuild): {output_path}")
+        manifest.save()
+        return status
+
+    qr_cache = None
+    if args.qr_cache_dir:
+        from back_labels import QRCodeCache
+        qr_cache = QRCodeCache(cache_dir=args.qr_cache_dir)
+
+    resources = None
+    if 'front' in sheets:
+        from front_labels import LabelResources
+        resources = LabelResources(font_path=options['font'], profile=profile)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    render_combined(
+        plan, batch_config, output_path, resources,
+        front_copies=options['front_copies'],
+        num_labels=options['num_labels'],
+        lot_number=options['lot_number'],
+        qr_cache=qr_cache,
+        qr_mode=options['qr_mode'],
+        profile=profile,
+    )
+    manifest.record(output_path, digest)
+    manifest.save()
+    return status
 
-                self.draw_label(c, x, y, label_index=label_count)
-                label_count += 1
 
-            if label_count >= num_labels:
-                break
+def write_sheets(args, slugs, batch_config, sheets, options, output_dir, manifest, profile=None):
+    """
+    Render each selected sheet to its own PDF, skipping up-to-date ones.
 
-        c.save()
-        print(f"Generated {label_count} labels: {output_path}")
+    Returns:
+        Exit status
+    """
+    base_dir = Path(__file__).parent.parent
+    digests = {}
+    tasks = []
+    skipped = 0
+    status = 0
+    for slug in slugs:
+        recipe_path = base_dir / batch_config[slug]['recipe']
+        if not recipe_path.exists():
+            print(f"Error: Recipe not found for '{slug}': {recipe_path}")
+            status = 1
+            continue
+        # Index the recipe up front so workers read it rather than re-parse it
+        shared_recipe_index().lookup(recipe_path)
+        for sheet in sheets:
+            digest = manifest.task_digest(sheet, batch_config[slug], options)
+            if not args.force and manifest.is_current(output_path_for(output_dir, sheet, slug), digest):
+                skipped += 1
+                continue
+            digests[sheet, slug] = digest
+            tasks.append((sheet, slug, batch_config[slug], output_dir, options))
+    shared_recipe_index().save()
+
+    if skipped:
+        print(f"Skipped {skipped} up-to-date sheet(s) (use --force to rebuild)")
+
+    # Template, fonts and QR codes are loaded once per process and shared by every batch
+    done = run_tasks(tasks, jobs=args.jobs, qr_cache_dir=args.qr_cache_dir, profile=profile) if tasks else []
+    for sheet, slug in done:
+        manifest.record(output_path_for(output_dir, sheet, slug), digests[sheet, slug])
+    manifest.save()
+
+    if len(done) < len(tasks):
+        status = 1
+    return status
+
+
+def report_profile(profile, args, wall_seconds):
+    """Print the --profile report and write the --profile-json file, if requested."""
+    print("Render profile:")
+    for line in profile.report():
+        print(f"  {line}")
+    print(f"  wall time: {wall_seconds * 1000:.1f} ms ({args.jobs} job(s))")
+
+    if args.profile_json:
+        data = profile.to_dict()
+        data['timestamp'] = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+        data['jobs'] = args.jobs
+        data['wall_seconds'] = wall_seconds
+        Path(args.profile_json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.profile_json, 'w') as f:
+            json.dump(data, f, indent=2)
+        print(f"Saved profile: {args.profile_json}")
 
 
 def main():
@@ -421,91 +594,248 @@ def main():
 Examples:
   %(prog)s navarino-road
   %(prog)s navarino-road --labels 12
+  %(prog)s navarino-road --labels 48
+  %(prog)s navarino-road colvestone
+  %(prog)s 'col*'
+  %(prog)s --all
+  %(prog)s --all --jobs 4
+  %(prog)s colvestone --lot "LOT 095"
+  %(prog)s --all --back-only
+  %(prog)s --all --combine --order lots
+  %(prog)s --all --site
+  %(prog)s --all --force --profile-json .cache/profile.json
+  %(prog)s --list
         '''
     )
     parser.add_argument(
-        'batch',
-        help='Batch slug (e.g., navarino-road)'
+        'batches',
+        nargs='*',
+        metavar='batch',
+        help='Batch slugs or glob patterns (e.g., navarino-road, "col*")'
+    )
+    parser.add_argument(
+        '--all',
+        action='store_true',
+        help='Generate labels for every configured batch'
+    )
+    parser.add_argument(
+        '--list',
+        action='store_true',
+        help='List the batches recorded in brew-log.md and exit'
+    )
+    sheets = parser.add_mutually_exclusive_group()
+    sheets.add_argument(
+        '--front-only',
+        action='store_true',
+        help='Only generate front labels'
+    )
+    sheets.add_argument(
+        '--back-only',
+        action='store_true',
+        help='Only generate back labels'
     )
     parser.add_argument(
         '--labels',
         type=int,
         default=16,
-        help='Number of labels to generate (default: 16, max: 16)'
+        help='Number of back labels to generate, 16 per page (default: 16)'
+    )
+    parser.add_argument(
+        '--front-copies',
+        type=int,
+        default=2,
+        help='Number of front labels to generate, 2 per page (default: 2)'
     )
     parser.add_argument(
         '--lot',
         type=str,
-        help='Lot number (e.g., LOT 098 or LOT 098-A for variants)'
+        help='Lot number (e.g., LOT 098 or LOT 098-A for variants); '
+             'lots in brew-log.md use their own recipe and ABV'
+    )
+    parser.add_argument(
+        '--qr-cache',
+        action='store_true',
+        help='Persist encoded QR PNGs across runs; only raster QR codes are '
+             'cached, so this implies --qr-mode raster'
+    )
+    parser.add_argument(
+        '--qr-cache-dir',
+        metavar='DIR',
+        help=f'Directory for --qr-cache (default: .cache/{QR_CACHE_DIR.name}; implies --qr-cache)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-render sheets even if their inputs are unchanged'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Render sheets in N worker processes (default: 1, 0 = one per CPU)'
+    )
+    parser.add_argument(
+        '--qr-mode',
+        choices=['vector', 'raster'],
+        help='Draw QR codes as vector paths or embedded PNGs '
+             '(default: vector, or raster with --qr-cache)'
+    )
+    parser.add_argument(
+        '--font',
+        metavar='PATH',
+        help='Font file for the front label street name (default: $LABEL_FONT, '
+             'else Georgia or a similar serif found in the system font directories '
+             'or $LABEL_FONT_PATH, else built-in Times)'
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        '--combine',
+        action='store_true',
+        help='Write one print-ready PDF instead of a file per sheet'
+    )
+    parser.add_argument(
+        '--order',
+        choices=['sheets', 'lots'],
+        help='Page order of the combined PDF: every front sheet then every back '
+             'sheet ("sheets", the default) or each lot\'s front then back ("lots")'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        metavar='PATH',
+        help='Combined PDF path (default: output/labels/combined-labels.pdf)'
+    )
 
-    # Batch configuration
-    # Future: Could parse from brew-log.md automatically
-    batch_config = {
-        'navarino-road': {
-            'name': 'Navarino Road',
-            'style': 'Hibiscus Mead',
-            'recipe': 'recipes/hibiscus-mead.json',
-            'abv': '11.81',
-            'url': 'https://andreacampi.github.io/brewery/navarino-road/',
-            'lot': 'LOT 098',
-        },
-        'colvestone': {
-            'name': 'Colvestone',
-            'style': 'Blackberry Mead',
-            'recipe': 'recipes/blackberry-mead-2026-01.json',
-            'abv': '10.9',
-            'url': 'https://andreacampi.github.io/brewery/colvestone/',
-            'lot': 'LOT 100',
-        },
-        'broadway': {
-            'name': 'Broadway',
-            'style': 'American IPA',
-            'recipe': '.cache/recipes/1139286.json',
-            'abv': '6.01',
-            'url': 'https://andreacampi.github.io/brewery/broadway/',
-            'lot': 'LOT 102',
-        },
-    }
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Time each render stage and report counts and output bytes per page'
+    )
+    parser.add_argument(
+        '--profile-json',
+        metavar='PATH',
+        help='Also write the profile as JSON (implies --profile)'
+    )
+    parser.add_argument(
+        '--site',
+        action='store_true',
+        help='Also rebuild the changed batch pages in docs/ that the QR codes point to'
+    )
+
+    args = parser.parse_args()
 
-    config = batch_config.get(args.batch)
-    if not config:
-        print(f"Error: Unknown batch '{args.batch}'")
-        print(f"Available batches: {', '.join(batch_config.keys())}")
+    # Batch configuration comes from brew-log.md (parse cached in .cache/)
+    brew_log = BrewLog.load()
+    batch_config = {slug: brew_log.batch_config(slug) for slug in brew_log.batches()}
+
+    if args.list:
+        for slug, config in batch_config.items():
+            print(f"{config['lot']:<9} {slug:<24} {config['name']} ({config['style']})")
+        return 0
+
+    if args.all:
+        slugs = list(batch_config)
+    elif not args.batches and args.lot and brew_log.slug_for_lot(args.lot):
+        slugs = [brew_log.slug_for_lot(args.lot)]
+    elif args.batches:
+        slugs, unknown = select_batches(args.batches, batch_config)
+        if unknown:
+            print(f"Error: Unknown batch '{unknown[0]}'")
+            print(f"Available batches: {', '.join(batch_config.keys())}")
+            return 1
+    else:
+        parser.error('specify at least one batch, --lot or --all')
+
+    if args.lot and len(slugs) > 1:
+        print("Error: --lot can only be used with a single batch")
         return 1
 
+    # A lot recorded in the log (e.g. an older brew reusing a street name)
+    # brings its own recipe and ABV; anything else just overrides the label text
+    lot_override = args.lot
+    if args.lot and brew_log.slug_for_lot(args.lot) == slugs[0]:
+        lot_config = brew_log.lot_config(args.lot)
+        if lot_config:
+            batch_config[slugs[0]] = lot_config
+            lot_override = None
+
     # Validate label count
-    if args.labels < 1 or args.labels > 16:
-        print("Error: Labels must be between 1 and 16")
+    if args.labels < 1:
+        print("Error: Labels must be at least 1")
+        return 1
+    if args.front_copies < 1:
+        print("Error: Front copies must be at least 1")
+        return 1
+    if args.output and not args.combine:
+        print("Error: --output can only be used with --combine")
+        return 1
+    if args.order and not args.combine:
+        print("Error: --order can only be used with --combine")
+        return 1
+    if args.jobs < 0:
+        print("Error: Jobs must be 0 or more")
         return 1
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    if args.qr_cache_dir:
+        args.qr_cache = True
+    if args.qr_cache and args.qr_mode == 'vector':
+        print("Error: --qr-cache only applies to raster QR codes (--qr-mode raster)")
+        return 1
+    if args.qr_cache:
+        args.qr_mode = 'raster'
+        args.qr_cache_dir = args.qr_cache_dir or str(QR_CACHE_DIR)
+
+    if args.front_only:
+        sheets = ('front',)
+    elif args.back_only:
+        sheets = ('back',)
+    else:
+        sheets = ('front', 'back')
+
+    # Searching the font directories is only worth it for front sheets
+    font_path = None
+    if 'front' in sheets:
+        try:
+            font_path = resolve_font(args.font)
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            return 1
 
     # Set up paths
     base_dir = Path(__file__).parent.parent
-    recipe_path = base_dir / config['recipe']
     output_dir = base_dir / 'output' / 'labels'
     output_dir.mkdir(parents=True, exist_ok=True)
-    output_path = output_dir / f"{args.batch}-labels.pdf"
-
-    # Determine lot number (CLI arg overrides config)
-    lot_number = args.lot or config.get('lot')
 
-    # Generate front labels
-    front_output = output_dir / f"{args.batch}-front-labels.pdf"
-    FrontLabelGenerator(config['name']).generate_pdf(front_output)
+    options = {
+        'front_copies': args.front_copies,
+        'num_labels': args.labels,
+        'lot_number': lot_override,
+        'qr_mode': args.qr_mode,
+        'font': str(font_path) if font_path else None,
+    }
 
-    # Generate back labels
-    generator = BreweryLabelGenerator(
-        batch_name=config['name'],
-        style=config['style'],
-        recipe_path=recipe_path,
-        abv=config['abv'],
-        url=config['url'],
-        lot_number=lot_number
-    )
-    generator.generate_pdf(output_path, num_labels=args.labels)
-    return 0
+    profile = None
+    if args.profile or args.profile_json:
+        from render_profile import RenderProfile
+        profile = RenderProfile()
+    started = time.perf_counter()
+
+    manifest = BuildManifest(output_dir)
+    if args.combine:
+        status = write_combined(args, slugs, batch_config, sheets, options, output_dir, manifest,
+                                profile=profile)
+    else:
+        status = write_sheets(args, slugs, batch_config, sheets, options, output_dir, manifest,
+                              profile=profile)
+    # Pages don't depend on the PDFs (and cope with a missing recipe), so
+    # they are rebuilt even if some sheets failed
+    if args.site:
+        status = build_site(brew_log) or status
+
+    if profile is not None:
+        report_profile(profile, args, time.perf_counter() - started)
+    return status
 
 
 if __name__ == '__main__':
@@ -0,0 +1,92 @@
+"""
+Paths to the assets shared by the label generators.
+
+Kept free of third-party imports so the CLI can hash inputs, list batches and
+validate arguments without loading any PDF library.
+
+The front label font is looked up rather than hardcoded: an explicit path
+(--font or $LABEL_FONT) wins, then the first of FONT_CANDIDATES found in
+assets/fonts/, $LABEL_FONT_PATH and the usual macOS, Linux and Windows font
+directories. Georgia comes first, then serif faces with similar metrics.
+If none is installed the labels use PyMuPDF's built-in Times (BUILTIN_FONT),
+which needs no font file at all.
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).parent.parent
+ASSETS_DIR = BASE_DIR / 'assets'
+LABEL_TEMPLATE = ASSETS_DIR / 'label-template.pdf'
+QR_CACHE_DIR = BASE_DIR / '.cache' / 'qr'
+FONTS_DIR = ASSETS_DIR / 'fonts'
+
+# Font file names in order of preference
+FONT_CANDIDATES = (
+    'Georgia.ttf',
+    'georgia.ttf',
+    'Gelasio-Regular.ttf',  # metric-compatible with Georgia
+    'DejaVuSerif.ttf',
+    'LiberationSerif-Regular.ttf',
+    'NotoSerif-Regular.ttf',
+)
+
+# Directories searched (recursively) for FONT_CANDIDATES, after $LABEL_FONT_PATH
+FONT_SEARCH_DIRS = (
+    FONTS_DIR,
+    Path('~/Library/Fonts').expanduser(),
+    Path('/System/Library/Fonts/Supplemental'),
+    Path('/Library/Fonts'),
+    Path('~/.local/share/fonts').expanduser(),
+    Path('~/.fonts').expanduser(),
+    Path('/usr/local/share/fonts'),
+    Path('/usr/share/fonts'),
+    Path('C:/Windows/Fonts'),
+)
+
+# PyMuPDF base-14 font used when no font file is found (Times-Roman)
+BUILTIN_FONT = 'tiro'
+
+
+def font_search_dirs():
+    """Return the font directories to search, $LABEL_FONT_PATH entries first."""
+    extra = [Path(p).expanduser() for p in os.environ.get('LABEL_FONT_PATH', '').split(os.pathsep) if p]
+    return extra + list(FONT_SEARCH_DIRS)
+
+
+def resolve_font(font_path=None):
+    """
+    Find the font file for front labels.
+
+    Args:
+        font_path: Explicit font file (default: $LABEL_FONT, then a search
+            of font_search_dirs() for FONT_CANDIDATES)
+
+    Returns:
+        Path to a font file, or None to use the built-in BUILTIN_FONT
+
+    Raises:
+        FileNotFoundError: If an explicitly requested font does not exist
+    """
+    font_path = font_path or os.environ.get('LABEL_FONT')
+    if font_path:
+        path = Path(font_path).expanduser()
+        if not path.is_file():
+            raise FileNotFoundError(f"Font not found: {path}")
+        return path
+    return _search_font(tuple(font_search_dirs()))
+
+
+@lru_cache(maxsize=None)
+def _search_font(dirs):
+    # One walk of each directory, then pick by preference
+    found = {}
+    for directory in dirs:
+        if not directory.is_dir():
+            continue
+        for path in directory.rglob('*.[tT][tT][fF]'):
+            if path.name in FONT_CANDIDATES:
+                found.setdefault(path.name, path)
+    return next((found[name] for name in FONT_CANDIDATES if name in found), None)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Search recipes by ingredient, style and stat ranges.
+
+Built on the recipe index (recipes.RecipeIndex), whose all_ingredients list
+names every ingredient of a recipe (hops and yeast included, cleaned with
+clean_ingredient_name but not marketing-filtered). On top of it,
+SearchIndex keeps an inverted index from ingredient and style tokens to
+recipes, and a sorted range index per stat (ABV, IBU, OG, FG, SRM).
+A query only touches the postings of its terms and the slices of its
+ranges, then intersects them, smallest first.
+
+Query syntax: clauses separated by commas or an uppercase AND (a lowercase
+"and" is part of a term, as in "sweet and sour"), e.g.
+
+    honey AND hibiscus, ABV 10-12
+    blackberr, NOT clove, OG >= 1.100
+    style:mead, IBU < 5
+"""
+
+import argparse
+import re
+import time
+from bisect import bisect_left, bisect_right
+
+from recipes import RecipeIndex, format_ingredients
+
+
+RANGE_FIELDS = ('abv', 'ibu', 'og', 'fg', 'srm')
+
+TOKEN = re.compile(r'[^\W_]+')
+CLAUSE_SPLIT = re.compile(r'\s*,\s*|\s+AND\s+')
+RANGE_CLAUSE = re.compile(
+    r'^(abv|ibu|og|fg|srm)\s*(?:'
+    r'(?P<low>\d+(?:\.\d+)?)\s*(?:-|–|\.\.|to)\s*(?P<high>\d+(?:\.\d+)?)'
+    r'|(?P<op><=|>=|<|>|=)\s*(?P<value>\d+(?:\.\d+)?)'
+    r')%?$',
+    re.IGNORECASE,
+)
+RANGE_FIELD = re.compile(r'^(abv|ibu|og|fg|srm)\b', re.IGNORECASE)
+# A clause that still starts or ends with AND had nothing on one side of it
+DANGLING_AND = re.compile(r'^AND\b|\bAND$')
+
+
+def tokenize(text):
+    """
+    Split text into search tokens.
+
+    Tokens are casefolded and plurals are folded onto the singular
+    ("Blackberries" -> "blackberry", "Cloves" -> "clove"), so queries match
+    whichever form a recipe uses.
+    """
+    tokens = []
+    for token in TOKEN.findall(text.casefold()):
+        if len(token) > 4 and token.endswith('ies'):
+            token = token[:-3] + 'y'
+        elif len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class Query:
+    """A parsed search query: ingredient terms, excluded terms, style terms and ranges."""
+
+    def __init__(self, include=(), exclude=(), style=(), ranges=None):
+        """
+        Args:
+            include: Token lists that must each match the recipe's ingredients
+            exclude: Token lists that must not match
+            style: Tokens that must match the style or recipe name
+            ranges: Mapping of stat to (low, high, low_inclusive, high_inclusive);
+                None bounds are open
+        """
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self.style = list(style)
+        self.ranges = dict(ranges or {})
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Parse a query string (see the module docstring).
+
+        Raises:
+            ValueError: If a clause cannot be parsed
+        """
+        query = cls()
+        for clause in CLAUSE_SPLIT.split(text.strip()):
+            if not clause:
+                continue
+            if DANGLING_AND.search(clause):
+                raise ValueError(f"Missing term next to AND: '{clause}'")
+            m = RANGE_CLAUSE.match(clause)
+            if m:
+                query.add_range(m.group(1).lower(), *_bounds(m))
+            elif RANGE_FIELD.match(clause):
+                raise ValueError(f"Cannot parse range: '{clause}' (e.g. 'ABV 10-12' or 'OG >= 1.100')")
+            elif clause.lower().startswith('style:'):
+                query.style.extend(tokenize(clause[6:]))
+            elif clause.upper().startswith('NOT '):
+                query.exclude.append(_terms(clause[4:]))
+            else:
+                query.include.append(_terms(clause))
+        return query
+
+    def add_range(self, field, low=None, high=None, low_inclusive=True, high_inclusive=True):
+        """Restrict a stat to a range, intersecting with any existing restriction."""
+        old = self.ranges.get(field)
+        if old:
+            if old[0] is not None and (low is None or old[0] > low or (old[0] == low and not old[2])):
+                low, low_inclusive = old[0], old[2]
+            if old[1] is not None and (high is None or old[1] < high or (old[1] == high and not old[3])):
+                high, high_inclusive = old[1], old[3]
+        self.ranges[field] = (low, high, low_inclusive, high_inclusive)
+
+
+def _terms(text):
+    tokens = tokenize(text)
+    if not tokens:
+        raise ValueError(f"Empty search term: '{text}'")
+    return tokens
+
+
+def _bounds(m):
+    if m.group('low') is not None:
+        return float(m.group('low')), float(m.group('high')), True, True
+    value = float(m.group('value'))
+    op = m.group('op')
+    if op == '=':
+        return value, value, True, True
+    if op.startswith('>'):
+        return value, None, op == '>=', True
+    return None, value, True, op == '<='
+
+
+def _range_value(entry, field):
+    value = entry.get(field)
+    return value if value is not None else entry.get(f'computed_{field}')
+
+
+class SearchIndex:
+    """Inverted and range indexes over recipe index entries."""
+
+    def __init__(self, entries):
+        """
+        Build the indexes.
+
+        Args:
+            entries: Mapping of recipe key to index entry (RecipeIndex.entries)
+        """
+        self.entries = entries
+        self.ingredients = {}
+        self.styles = {}
+        for key, entry in entries.items():
+            for name in entry['all_ingredients']:
+                for token in tokenize(name):
+                    self.ingredients.setdefault(token, set()).add(key)
+            for token in tokenize(f"{entry.get('style') or ''} {entry.get('name') or ''}"):
+                self.styles.setdefault(token, set()).add(key)
+
+        # Sorted (value, key) pairs, using the stated value and falling back
+        # to the computed estimate; terms are matched as token prefixes, so
+        # each posting table also keeps its tokens sorted for bisection
+        self.ranges = {}
+        for field in RANGE_FIELDS:
+            values = ((_range_value(e, field), k) for k, e in entries.items())
+            pairs = sorted((v, k) for v, k in values if v is not None)
+            self.ranges[field] = ([v for v, _ in pairs], [k for _, k in pairs])
+        self._ingredient_tokens = sorted(self.ingredients)
+        self._style_tokens = sorted(self.styles)
+
+    @classmethod
+    def from_recipe_index(cls, index=None):
+        """Build from a RecipeIndex, refreshing and saving it first."""
+        index = index or RecipeIndex()
+        index.refresh()
+        index.save()
+        return cls(index.entries)
+
+    def _postings(self, postings, tokens, token):
+        # Every recipe with a token starting with the query token
+        start = bisect_left(tokens, token)
+        keys = set()
+        for candidate in tokens[start:]:
+            if not candidate.startswith(token):
+                break
+            keys |= postings[candidate]
+        return keys
+
+    def _term(self, postings, tokens, term):
+        keys = None
+        for token in term:
+            matches = self._postings(postings, tokens, token)
+            keys = matches if keys is None else keys & matches
+            if not keys:
+                break
+        return keys
+
+    def _range(self, field, low, high, low_inclusive, high_inclusive):
+        values, keys = self.ranges[field]
+        start = 0 if low is None else (bisect_left if low_inclusive else bisect_right)(values, low)
+        end = len(values) if high is None else (bisect_right if high_inclusive else bisect_left)(values, high)
+        return set(keys[start:end])
+
+    def search(self, query):
+        """
+        Find recipes matching a query.
+
+        Args:
+            query: Query, or a query string
+
+        Returns:
+            List of (key, entry) tuples sorted by key
+        """
+        if isinstance(query, str):
+            query = Query.parse(query)
+
+        candidates = [self._term(self.ingredients, self._ingredient_tokens, t) for t in query.include]
+        if query.style:
+            candidates.append(self._term(self.styles, self._style_tokens, query.style))
+        candidates.extend(self._range(field, *bounds) for field, bounds in query.ranges.items())
+
+        if candidates:
+            candidates.sort(key=len)
+            keys = candidates[0]
+            for other in candidates[1:]:
+                if not keys:
+                    break
+                keys = keys & other
+        else:
+            keys = set(self.entries)
+
+        for term in query.exclude:
+            if not keys:
+                break
+            keys = keys - self._term(self.ingredients, self._ingredient_tokens, term)
+
+        return [(key, self.entries[key]) for key in sorted(keys)]
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description='Search recipes by ingredient, style, ABV, IBU, OG, FG or SRM',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  %(prog)s "honey AND hibiscus, ABV 10-12"
+  %(prog)s "blackberr, NOT clove, OG >= 1.100"
+  %(prog)s "style:ipa, IBU 20-60"
+        '''
+    )
+    parser.add_argument('query', nargs='+', help='Search query (clauses separated by commas or AND)')
+    args = parser.parse_args()
+
+    try:
+        query = Query.parse(' '.join(args.query))
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    index = SearchIndex.from_recipe_index()
+    start = time.perf_counter()
+    results = index.search(query)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for key, entry in results:
+        abv = f"{entry['abv']:.2f}%" if entry.get('abv') is not None else '?'
+        print(f"{key}: {entry['name']} ({entry.get('style') or 'no style'}, {abv})")
+        print(f"  {format_ingredients(entry['ingredients'])}")
+    print(f"{len(results)} of {len(index.entries)} recipes ({elapsed:.3f} ms)")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
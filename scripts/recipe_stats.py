@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Compute OG, FG, ABV, IBU and SRM from a recipe's ingredient rows.
+
+Every recipe in a call is flattened into one table of fermentable rows and
+one of hop rows, each row tagged with the position of its recipe. The
+calculations then run as a handful of NumPy array operations with per-recipe
+sums done by np.bincount, so recomputing the whole .cache/recipes/ library
+costs about the same number of Python-level steps as a single recipe.
+
+Formulas:
+- OG: extract (amount x dry yield x (1 - moisture), times mash efficiency
+  for grains) at 383.8 gravity points per kg/L (46 PPG) over kettle volume
+- FG: fermentable points left by the row's attenuation (the yeast's unless
+  the fermentable sets its own), plus fermentables added after primary
+  fermentation (e.g. backsweetening honey), which are not fermented
+- ABV: fermented points x 0.13125
+- IBU: Tinseth, boil hop additions only
+- SRM: Morey, from the fermentables' colour
+
+The results are estimates: the attenuation and volume assumptions suit
+beers better than meads. The recipe index keeps them as computed_* fields
+next to the stored stats, which labels and pages use.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from recipes import RECIPE_DIRS, RecipeIndex, load_recipe
+
+
+# Gravity points per kg of extract per litre of wort (46 PPG)
+EXTRACT_POINTS = 383.8
+# Share of grain extract that reaches the kettle; sugars dissolve completely
+MASH_EFFICIENCY = 0.70
+# Apparent attenuation when a recipe lists no yeast attenuation
+DEFAULT_ATTENUATION = 0.75
+ABV_FACTOR = 0.13125  # % ABV per gravity point fermented
+
+KG_PER_UNIT = {'GR': 0.001, 'KG': 1.0}
+KG_TO_LB = 2.20462
+LITRES_PER_GALLON = 3.78541
+
+STATS = ('og', 'fg', 'abv', 'ibu', 'srm')
+
+
+def _number(value):
+    if value in (None, ''):
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class IngredientTable:
+    """
+    Ingredient rows of many recipes as flat NumPy arrays.
+
+    Fermentable arrays (recipe, kg, yield_, moisture, attenuation, colour,
+    grain, post) have one entry per fermentable row; hop arrays (hop_recipe,
+    hop_grams, alpha, minutes) one per boil hop addition; volume and
+    yeast_attenuation one per recipe. Missing numbers are NaN.
+    """
+
+    def __init__(self, recipes):
+        """
+        Flatten the ingredient rows of parsed recipes.
+
+        Args:
+            recipes: Sequence of parsed recipe dicts
+        """
+        self.count = len(recipes)
+        ferm = []
+        hops = []
+        volume = []
+        yeast = []
+
+        for i, recipe in enumerate(recipes):
+            for mash in recipe.get('mashing', []):
+                for ing in mash.get('ingredient_additions', []):
+                    if ing.get('ingredient_type') == 'FERM':
+                        ferm.append(self._fermentable(i, ing, post=False))
+            # Fermentables added while fermenting (backsweetening) stay unfermented
+            for ing in (recipe.get('while_fermenting') or {}).get('other_ingredients', []):
+                if ing.get('ingredient_type') == 'FERM':
+                    ferm.append(self._fermentable(i, ing, post=True))
+
+            for boil in recipe.get('boiling') or []:
+                for hop in boil.get('hops', []):
+                    hops.append((
+                        i,
+                        _number(hop.get('amount')) * KG_PER_UNIT.get(hop.get('amount_units'), np.nan) * 1000,
+                        _number(hop.get('alpha_acid')),
+                        _number(hop.get('duration')),
+                    ))
+
+            kettle = _number(recipe.get('kettle_water'))
+            volume.append(kettle if kettle > 0 else _number(recipe.get('water_amount')))
+            attenuations = [_number(y.get('ingredient_attenuation'))
+                            for stage in recipe.get('fermenting', [])
+                            for y in stage.get('yeast', [])]
+            yeast.append(np.nanmax(attenuations) if attenuations and not np.isnan(attenuations).all()
+                         else np.nan)
+
+        ferm_cols = np.array(ferm, dtype=float).reshape(-1, 8).T
+        (recipe_idx, self.kg, self.yield_, self.moisture, self.attenuation,
+         self.colour, self.grain, self.post) = ferm_cols
+        self.recipe = recipe_idx.astype(np.intp)
+        self.grain = self.grain.astype(bool)
+        self.post = self.post.astype(bool)
+
+        hop_cols = np.array(hops, dtype=float).reshape(-1, 4).T
+        hop_idx, self.hop_grams, self.alpha, self.minutes = hop_cols
+        self.hop_recipe = hop_idx.astype(np.intp)
+
+        self.volume = np.array(volume, dtype=float)
+        self.yeast_attenuation = np.array(yeast, dtype=float)
+
+    @staticmethod
+    def _fermentable(i, ing, post):
+        return (
+            i,
+            _number(ing.get('amount')) * KG_PER_UNIT.get(ing.get('amount_units'), np.nan),
+            _number(ing.get('ingredient_dry_yield')),
+            _number(ing.get('ingredient_moisture')),
+            _number(ing.get('ingredient_attenuation')),
+            _number(ing.get('srm')),
+            ing.get('fermentable_type') == 'GRA',
+            post,
+        )
+
+    def per_recipe(self, recipe, values):
+        """Sum row values per recipe, ignoring NaN rows."""
+        return np.bincount(recipe, weights=np.nan_to_num(values), minlength=self.count)
+
+
+def compute_stats(recipes):
+    """
+    Compute stats for many recipes at once.
+
+    Args:
+        recipes: Sequence of parsed recipe dicts
+
+    Returns:
+        Dict of 'og', 'fg', 'abv', 'ibu' and 'srm' to float arrays, one
+        entry per recipe; NaN where a recipe lacks the data (no volume or
+        no fermentables)
+    """
+    t = IngredientTable(recipes)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        volume = np.where(t.volume > 0, t.volume, np.nan)
+
+        # Gravity points each fermentable row contributes to the batch
+        extract = t.kg * t.yield_ / 100 * (1 - np.nan_to_num(t.moisture) / 100)
+        extract = np.where(t.grain, extract * MASH_EFFICIENCY, extract)
+        points = EXTRACT_POINTS * extract / volume[t.recipe]
+
+        row_attenuation = np.where(np.isnan(t.attenuation),
+                                   t.yeast_attenuation[t.recipe], t.attenuation) / 100
+        row_attenuation = np.where(np.isnan(row_attenuation), DEFAULT_ATTENUATION, row_attenuation)
+
+        pre = np.where(t.post, 0.0, points)
+        og_points = t.per_recipe(t.recipe, pre)
+        fermented = t.per_recipe(t.recipe, pre * row_attenuation)
+        residual = og_points - fermented + t.per_recipe(t.recipe, np.where(t.post, points, 0.0))
+
+        has_extract = (t.per_recipe(t.recipe, ~np.isnan(points)) > 0) & ~np.isnan(volume)
+        og = np.where(has_extract, 1 + og_points / 1000, np.nan)
+        fg = np.where(has_extract, 1 + residual / 1000, np.nan)
+        abv = np.where(has_extract, fermented * ABV_FACTOR, np.nan)
+
+        # Tinseth: bigness factor (from OG) x boil time factor x mg/L alpha acids
+        hop_og = np.nan_to_num(og, nan=1.0)[t.hop_recipe]
+        utilisation = (1.65 * 0.000125 ** (hop_og - 1)
+                       * (1 - np.exp(-0.04 * np.nan_to_num(t.minutes))) / 4.15)
+        alpha_mg_l = t.alpha / 100 * t.hop_grams * 1000 / volume[t.hop_recipe]
+        ibu = np.where(np.isnan(volume), np.nan,
+                       t.per_recipe(t.hop_recipe, utilisation * alpha_mg_l))
+
+        # Morey: malt colour units (lb x degrees Lovibond per gallon)
+        mcu = t.per_recipe(t.recipe, t.kg * KG_TO_LB * t.colour) / (volume / LITRES_PER_GALLON)
+        srm = np.where(has_extract, 1.4922 * mcu ** 0.6859, np.nan)
+
+    return {'og': og, 'fg': fg, 'abv': abv, 'ibu': ibu, 'srm': srm}
+
+
+def stats_records(recipes):
+    """
+    Compute stats for many recipes, as one rounded dict per recipe.
+
+    Args:
+        recipes: Sequence of parsed recipe dicts
+
+    Returns:
+        List of dicts with og, fg, abv, ibu and srm (None where unknown)
+    """
+    arrays = compute_stats(recipes)
+    digits = {'og': 3, 'fg': 3, 'abv': 2, 'ibu': 1, 'srm': 1}
+    columns = {name: [None if np.isnan(v) else round(float(v), digits[name]) for v in arrays[name]]
+               for name in STATS}
+    return [{name: columns[name][i] for name in STATS} for i in range(len(recipes))]
+
+
+def recipe_stats(recipe):
+    """Compute OG, FG, ABV, IBU and SRM for one parsed recipe (see stats_records)."""
+    return stats_records([recipe])[0]
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description='Recompute recipe stats from ingredients',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  %(prog)s
+  %(prog)s recipes/hibiscus-mead.json
+  %(prog)s --quiet
+        '''
+    )
+    parser.add_argument('recipes', nargs='*', help='Recipe JSON files (default: every indexed recipe)')
+    parser.add_argument('--quiet', action='store_true', help='Only print the summary line')
+    args = parser.parse_args()
+
+    if args.recipes:
+        paths = args.recipes
+    else:
+        paths = [p for d in RECIPE_DIRS if d.is_dir() for p in sorted(d.glob('*.json'))]
+
+    recipes = []
+    loaded = []
+    for path in paths:
+        try:
+            recipes.append(load_recipe(path))
+        except (OSError, ValueError) as e:
+            print(f"Warning: Skipping {path}: {e}")
+            continue
+        loaded.append(path)
+
+    start = time.perf_counter()
+    records = stats_records(recipes)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    if not args.quiet:
+        print(f"{'recipe':<40} {'OG':>6} {'FG':>6} {'ABV':>6} {'IBU':>5} {'SRM':>5}  stated ABV")
+        for path, recipe, stats in zip(loaded, recipes, records):
+            cells = [f"{stats[n]:>{w}.{d}f}" if stats[n] is not None else f"{'?':>{w}}"
+                     for n, w, d in (('og', 6, 3), ('fg', 6, 3), ('abv', 6, 2), ('ibu', 5, 0), ('srm', 5, 1))]
+            print(f"{RecipeIndex.key(path):<40} {' '.join(cells)}  {recipe.get('abv') or '?'}")
+    print(f"Computed stats for {len(records)} recipe(s) in {elapsed:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,433 @@
+"""
+Recipe loading, ingredient extraction and a persistent recipe index.
+
+The index stores the marketing-filtered ingredient list, style and the
+ABV/IBU/OG/FG/SRM stated in the recipe file (alongside estimates computed
+from the ingredients by recipe_stats) for every recipe in recipes/ and
+.cache/recipes/, keyed by path and invalidated by file mtime and size, so
+label generation and searches (recipe_search) read one small file instead
+of re-parsing every recipe JSON.
+"""
+
+import json
+import hashlib
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).parent.parent
+RECIPE_DIRS = [BASE_DIR / 'recipes', BASE_DIR / '.cache' / 'recipes']
+INDEX_PATH = BASE_DIR / '.cache' / 'recipe-index.json'
+RECIPE_CACHE_SIZE = 256
+INGREDIENT_RULES = BASE_DIR / 'assets' / 'ingredient-rules.json'
+
+# Bump when the shape of index entries or the extraction logic changes
+# (edits to the rules file are picked up through its digest)
+INDEX_VERSION = 5
+
+
+def load_recipe(recipe_path):
+    """
+    Load and parse a recipe JSON file, once per version of the file.
+
+    The parse is cached per path, mtime and size, so a recipe edited while
+    the process runs (e.g. a long-lived service) is re-read. The cache keeps
+    the most recently used RECIPE_CACHE_SIZE parses, so superseded versions
+    of edited recipes are evicted rather than kept for the process lifetime.
+
+    Args:
+        recipe_path: Path to recipe JSON file
+
+    Returns:
+        Parsed recipe dict (shared between callers, do not mutate)
+    """
+    stat = os.stat(recipe_path)
+    return _load_recipe(str(recipe_path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=RECIPE_CACHE_SIZE)
+def _load_recipe(recipe_path, mtime_ns, size):
+    with open(recipe_path, 'r') as f:
+        return json.load(f)
+
+
+load_recipe.cache_clear = _load_recipe.cache_clear
+
+
+class IngredientRules:
+    """
+    Marketing filter rules compiled into single-pass regexes.
+
+    The rules file maps a reason (e.g. "fining agents") to the substrings that
+    exclude an ingredient, plus a list of patterns stripped from the names of
+    ingredients that are kept. All exclusion terms are compiled into one
+    case-insensitive alternation, and all strip patterns into another, so each
+    ingredient name is scanned once per rule set.
+    """
+
+    def __init__(self, exclude, strip):
+        """
+        Compile the rules.
+
+        Args:
+            exclude: Mapping of reason to list of excluded substrings
+            strip: List of regex patterns removed from kept names
+        """
+        terms = sorted({t.lower() for group in exclude.values() for t in group},
+                       key=len, reverse=True)
+        self.exclude = re.compile('|'.join(re.escape(t) for t in terms), re.IGNORECASE) if terms else None
+        self.strip = re.compile('|'.join(f'(?:{p})' for p in strip)) if strip else None
+        self.digest = hashlib.sha1(
+            json.dumps([exclude, strip], sort_keys=True).encode('utf-8')
+        ).hexdigest()
+
+    @classmethod
+    def from_file(cls, rules_path):
+        """Load rules from a JSON file with 'exclude' and 'strip' keys."""
+        with open(rules_path, 'r') as f:
+            data = json.load(f)
+        return cls(data.get('exclude', {}), data.get('strip', []))
+
+    def include(self, name):
+        """Return True if the ingredient passes the marketing rules."""
+        return self.exclude is None or self.exclude.search(name) is None
+
+    def clean(self, name):
+        """Return the name with strip patterns removed."""
+        if self.strip is None:
+            return name.strip()
+        return self.strip.sub('', name).strip()
+
+
+@lru_cache(maxsize=None)
+def load_ingredient_rules(rules_path=INGREDIENT_RULES):
+    """Load and compile the ingredient rules file, once per path per process."""
+    return IngredientRules.from_file(rules_path)
+
+
+def should_include_ingredient(name, rules=None):
+    """
+    Check if ingredient should be included per marketing rules.
+
+    Marketing rules live in assets/ingredient-rules.json (water, yeast
+    nutrients, fining agents, yeast and processing aids are skipped).
+
+    Args:
+        name: Ingredient name
+        rules: IngredientRules (default: the bundled rules file)
+
+    Returns:
+        True if ingredient should be included
+    """
+    return (rules or load_ingredient_rules()).include(name)
+
+
+def clean_ingredient_name(name, rules=None):
+    """
+    Clean up ingredient name by removing obvious processing details
+    (parenthetical annotations, per the strip patterns in the rules file).
+    Keep descriptive details that add flavor context.
+
+    Args:
+        name: Raw ingredient name
+        rules: IngredientRules (default: the bundled rules file)
+
+    Returns:
+        Cleaned ingredient name
+    """
+    return (rules or load_ingredient_rules()).clean(name)
+
+
+def extract_ingredients(recipe, rules=None):
+    """
+    Extract label ingredients from a parsed recipe, applying marketing filters.
+
+    Repeated ingredients (e.g. honey added at two stages) are listed once, at
+    their first position.
+
+    Args:
+        recipe: Parsed recipe dict
+        rules: IngredientRules (default: the bundled rules file)
+
+    Returns:
+        List of cleaned ingredient names, in recipe order
+    """
+    rules = rules or load_ingredient_rules()
+    names = []
+
+    # Extract from mashing section
+    for mash in recipe.get('mashing', []):
+        for ing in mash.get('ingredient_additions', []):
+            names.append(ing['ingredient_name'])
+
+    # Extract from fermenting section (yeast)
+    for ferment in recipe.get('fermenting', []):
+        for yeast in ferment.get('yeast', []):
+            names.append(yeast['ingredient_name'])
+
+    # Extract from while_fermenting (dry hops, adjuncts)
+    while_ferm = recipe.get('while_fermenting', {})
+    for ing in while_ferm.get('other_ingredients', []):
+        names.append(ing['ingredient_name'])
+
+    ingredients = []
+    seen = set()
+    for name in names:
+        if not rules.include(name):
+            continue
+        clean_name = rules.clean(name)
+        folded = clean_name.casefold()
+        if clean_name and folded not in seen:
+            seen.add(folded)
+            ingredients.append(clean_name)
+    return ingredients
+
+
+def all_ingredient_names(recipe, rules=None):
+    """
+    List every ingredient a recipe uses, for searching.
+
+    Unlike extract_ingredients, this covers every section (boil and dry hops
+    and yeast included) and applies no marketing filter; names are only
+    cleaned.
+
+    Args:
+        recipe: Parsed recipe dict
+        rules: IngredientRules (default: the bundled rules file)
+
+    Returns:
+        List of cleaned ingredient names, in recipe order, each listed once
+    """
+    rules = rules or load_ingredient_rules()
+    additions = []
+    for mash in recipe.get('mashing', []):
+        additions.extend(mash.get('ingredient_additions', []))
+    for boil in recipe.get('boiling', []):
+        additions.extend(boil.get('hops', []))
+    for ferment in recipe.get('fermenting', []):
+        additions.extend(ferment.get('yeast', []))
+    while_ferm = recipe.get('while_fermenting', {})
+    additions.extend(while_ferm.get('hops', []))
+    additions.extend(while_ferm.get('other_ingredients', []))
+
+    names = []
+    seen = set()
+    for ing in additions:
+        clean_name = rules.clean(ing['ingredient_name'])
+        folded = clean_name.casefold()
+        if clean_name and folded not in seen:
+            seen.add(folded)
+            names.append(clean_name)
+    return names
+
+
+def format_ingredients(ingredients):
+    """
+    Format an ingredient list for a label.
+
+    Returns:
+        Lowercase, comma-separated string with period (e.g., "honey, ginger.")
+    """
+    if ingredients:
+        return ', '.join(ingredients).lower() + '.'
+    return ''
+
+
+def _to_float(value):
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def summarize_recipe(recipe, rules=None, stats=None):
+    """
+    Build the index entry for a parsed recipe.
+
+    The stats stored in the recipe file (measured or set by the brewer) are
+    kept as abv, ibu, og, fg and srm. The estimates computed from the
+    ingredients are stored next to them as computed_abv, computed_ibu, ...;
+    they are not calibrated for meads and never go on a label.
+
+    Args:
+        recipe: Parsed recipe dict
+        rules: IngredientRules (default: the bundled rules file)
+        stats: Computed stats for the recipe (computed here if omitted)
+
+    Returns:
+        Dict with id, name, style, abv, ibu, og, fg, srm, their computed_*
+        estimates, ingredients (label list) and all_ingredients (every
+        ingredient, for search)
+    """
+    if stats is None:
+        from recipe_stats import recipe_stats
+        stats = recipe_stats(recipe)
+
+    style = (recipe.get('beer') or {}).get('style') or {}
+    entry = {
+        'id': recipe.get('id'),
+        'name': recipe.get('beer_name'),
+        'style': style.get('name'),
+        'ingredients': extract_ingredients(recipe, rules),
+        'all_ingredients': all_ingredient_names(recipe, rules),
+    }
+    for name in ('abv', 'ibu', 'og', 'fg', 'srm'):
+        entry[name] = _to_float(recipe.get(name))
+        entry[f'computed_{name}'] = stats[name]
+    return entry
+
+
+class RecipeIndex:
+    """Persistent index of recipe summaries with mtime-based invalidation."""
+
+    def __init__(self, index_path=INDEX_PATH, recipe_dirs=None, rules=None):
+        """
+        Initialize the index, loading any existing index file.
+
+        Args:
+            index_path: JSON file the index is persisted to
+            recipe_dirs: Directories scanned by refresh() (default: RECIPE_DIRS)
+            rules: IngredientRules used for extraction (default: bundled rules)
+        """
+        self.index_path = Path(index_path)
+        self.recipe_dirs = [Path(d) for d in (recipe_dirs or RECIPE_DIRS)]
+        self.rules = rules or load_ingredient_rules()
+        self.entries = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Entries built under other extraction logic or rules are discarded
+        if data.get('version') == INDEX_VERSION and data.get('rules') == self.rules.digest:
+            self.entries = data.get('recipes', {})
+
+    @staticmethod
+    def key(recipe_path):
+        """Return the index key for a recipe path (relative to the repo when possible)."""
+        path = Path(recipe_path).resolve()
+        try:
+            return str(path.relative_to(BASE_DIR.resolve()))
+        except ValueError:
+            return str(path)
+
+    def lookup(self, recipe_path):
+        """
+        Return the index entry for a recipe, re-parsing it only if it changed.
+
+        Args:
+            recipe_path: Path to recipe JSON file
+
+        Returns:
+            Index entry dict (see summarize_recipe)
+        """
+        entry = self._current(recipe_path)
+        if entry:
+            return entry
+        return self._update([recipe_path])[0]
+
+    def _current(self, recipe_path):
+        stat = os.stat(recipe_path)
+        entry = self.entries.get(self.key(recipe_path))
+        if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+            return entry
+        return None
+
+    def _update(self, recipe_paths):
+        # Stats for every changed recipe are computed in one vectorized pass
+        from recipe_stats import stats_records
+
+        recipes = [load_recipe(Path(p)) for p in recipe_paths]
+        entries = []
+        for recipe_path, recipe, stats in zip(recipe_paths, recipes, stats_records(recipes)):
+            stat = os.stat(recipe_path)
+            entry = summarize_recipe(recipe, self.rules, stats)
+            entry['mtime'] = stat.st_mtime
+            entry['size'] = stat.st_size
+            self.entries[self.key(recipe_path)] = entry
+            entries.append(entry)
+        if entries:
+            self.dirty = True
+        return entries
+
+    def refresh(self):
+        """
+        Bring the index up to date with the recipe directories.
+
+        New and modified recipes are re-parsed (and their stats recomputed
+        together); deleted ones are dropped.
+        """
+        seen = set()
+        stale = []
+        for recipe_dir in self.recipe_dirs:
+            if not recipe_dir.is_dir():
+                continue
+            for recipe_path in sorted(recipe_dir.glob('*.json')):
+                try:
+                    if not self._current(recipe_path):
+                        load_recipe(recipe_path)
+                        stale.append(recipe_path)
+                except (OSError, ValueError) as e:
+                    print(f"Warning: Skipping {recipe_path}: {e}")
+                    continue
+                seen.add(self.key(recipe_path))
+        self._update(stale)
+
+        for key in list(self.entries):
+            if key not in seen:
+                del self.entries[key]
+                self.dirty = True
+
+    def save(self):
+        """Write the index back to disk if anything changed."""
+        if not self.dirty:
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'rules': self.rules.digest,
+                'recipes': self.entries,
+            }, f)
+        tmp_path.replace(self.index_path)
+        self.dirty = False
+
+
+_SHARED_INDEX = None
+
+
+def shared_recipe_index():
+    """Return the process-wide RecipeIndex, loading it on first use."""
+    global _SHARED_INDEX
+    if _SHARED_INDEX is None:
+        _SHARED_INDEX = RecipeIndex()
+    return _SHARED_INDEX
+
+
+def batch_abv(config, index=None):
+    """
+    Return the ABV shown for a batch on its labels and page.
+
+    Older log entries have no Stats section; they fall back to the ABV
+    stored in the recipe file (never the computed estimate).
+
+    Args:
+        config: Batch configuration entry (see brew_log.BrewLog.batch_config)
+        index: RecipeIndex (default: the shared index)
+
+    Returns:
+        ABV as a string without the % sign ('?' if unknown)
+    """
+    if config['abv'] is not None:
+        return config['abv']
+    recipe_abv = (index or shared_recipe_index()).lookup(BASE_DIR / config['recipe'])['abv']
+    return f"{recipe_abv:g}" if recipe_abv is not None else '?'
@@ -0,0 +1,127 @@
+"""
+Opt-in instrumentation for label rendering.
+
+A RenderProfile collects wall time per named stage (template load, font
+embedding, QR encoding, ingredient wrapping, drawing, save), event counters
+(QR encodings, image embeds, ...) and the size of every document written.
+Generators take an optional profile; without one they use NULL_PROFILE,
+whose methods do nothing, so uninstrumented runs pay only a method call.
+
+Stages may nest: back.draw includes the back.wrap and back.qr_encode time
+of the labels it draws.
+
+Hooks registered with add_hook() are called as hook(stage, seconds) after
+each timed stage, e.g. to forward timings to a metrics system.
+"""
+
+import time
+from contextlib import contextmanager, nullcontext
+
+
+# Bump when the shape of to_dict() changes
+PROFILE_VERSION = 1
+
+
+class RenderProfile:
+    """Stage timings, counters and output sizes for one or more renders."""
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self.outputs = []
+        self.hooks = []
+
+    def add_hook(self, hook):
+        """Call hook(stage, seconds) after every timed stage."""
+        self.hooks.append(hook)
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one call of stage name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            entry = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            entry['calls'] += 1
+            entry['seconds'] += elapsed
+            for hook in self.hooks:
+                hook(name, elapsed)
+
+    def count(self, name, n=1):
+        """Add n to counter name."""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def record_output(self, sheet, name, size, pages):
+        """
+        Note a finished document.
+
+        Args:
+            sheet: Sheet kind ('front', 'back' or 'combined')
+            name: Batch name or output name
+            size: Bytes written (None if unknown)
+            pages: Number of pages
+        """
+        self.outputs.append({
+            'sheet': sheet,
+            'name': name,
+            'bytes': size,
+            'pages': pages,
+            'bytes_per_page': round(size / pages) if size is not None and pages else None,
+        })
+
+    def merge(self, data):
+        """Add the results of another profile (as returned by to_dict)."""
+        for name, entry in data['stages'].items():
+            mine = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            mine['calls'] += entry['calls']
+            mine['seconds'] += entry['seconds']
+        for name, n in data['counters'].items():
+            self.count(name, n)
+        self.outputs.extend(data['outputs'])
+
+    def to_dict(self):
+        """Return the results as a JSON-serialisable dict."""
+        return {
+            'version': PROFILE_VERSION,
+            'stages': {name: dict(entry) for name, entry in sorted(self.stages.items())},
+            'counters': dict(sorted(self.counters.items())),
+            'outputs': list(self.outputs),
+        }
+
+    def report(self):
+        """Return a human-readable report as a list of lines."""
+        lines = [f"{'stage':<28} {'calls':>7} {'total ms':>10} {'mean ms':>9}"]
+        for name, entry in sorted(self.stages.items(), key=lambda item: -item[1]['seconds']):
+            total = entry['seconds'] * 1000
+            lines.append(f"{name:<28} {entry['calls']:>7} {total:>10.2f} {total / entry['calls']:>9.3f}")
+        if self.counters:
+            lines.append('counters: ' + ', '.join(f"{k}={v}" for k, v in sorted(self.counters.items())))
+        for out in self.outputs:
+            size = f"{out['bytes']:,} B" if out['bytes'] is not None else '? B'
+            per_page = f"{out['bytes_per_page']:,} B/page" if out['bytes_per_page'] is not None else '? B/page'
+            lines.append(f"output: {out['sheet']:<8} {out['name']:<28} {size:>12} "
+                         f"{out['pages']:>4} page(s)  {per_page}")
+        return lines
+
+
+class NullProfile:
+    """Stand-in used when profiling is off; every method is a no-op."""
+
+    _context = nullcontext()
+
+    def add_hook(self, hook):
+        pass
+
+    def stage(self, name):
+        return self._context
+
+    def count(self, name, n=1):
+        pass
+
+    def record_output(self, sheet, name, size, pages):
+        pass
+
+
+NULL_PROFILE = NullProfile()